@@ -1,31 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db_with_tenant
 from app.services.author_service import AuthorService
 from app.schemas.author import AuthorCreate, AuthorRead
-from app.core.logging import get_logger
+from app.core.cache import cached_response, invalidate
 from typing import Annotated
 from starlette.status import (
     HTTP_400_BAD_REQUEST,
 )
 router = APIRouter(prefix="/authors", tags=["authors"])
+logger = logging.getLogger(__name__)
+
+_AUTHOR_LIST: TypeAdapter[list[AuthorRead]] = TypeAdapter(list[AuthorRead])
 
 
 @router.post("", response_model=AuthorRead)
-def create_author(
+async def create_author(
+    request: Request,
     data: AuthorCreate,
-    db: Annotated[Session, Depends(get_db_with_tenant)],
+    db: Annotated[AsyncSession, Depends(get_db_with_tenant)],
 ):
     try:
-        return AuthorService.create_author(db, data)
+        author = await AuthorService.create_author(db, data)
     except Exception as e:
         raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
+    await invalidate(request.state.tenant, "authors")
+    return author
 
 
 @router.get("", response_model=list[AuthorRead])
-def list_authors(
-    db: Annotated[Session, Depends(get_db_with_tenant)],
+async def list_authors(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_db_with_tenant)],
 ):
-    logger = get_logger(__name__)
     logger.info("Listing authors")
-    return AuthorService.list_authors(db)
+
+    async def render() -> tuple[bytes, dict[str, str]]:
+        authors = await AuthorService.list_authors(db)
+        return _AUTHOR_LIST.dump_json(_AUTHOR_LIST.validate_python(authors, from_attributes=True)), {}
+
+    return await cached_response(request, "authors", render)
@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
+import re
+from fastapi import APIRouter, Body, Depends, Path, Query, HTTPException, Request
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db_with_tenant
 from app.services.book_service import BookService
+from app.core.cache import cached_response, invalidate
 from app.schemas.book import BookCreate, BookRead
+from app.utils.pagination import decode_cursor, encode_cursor
+from datetime import date
 from typing import Annotated
 import uuid
 from starlette.status import (
@@ -11,41 +16,113 @@ from starlette.status import (
 )
 router = APIRouter(prefix="/books", tags=["books"])
 
+_BOOK_LIST: TypeAdapter[list[BookRead]] = TypeAdapter(list[BookRead])
+
+# Most books accepted by one bulk create
+_MAX_BULK_BOOKS = 1000
+
+# Constraint violations in one case-insensitive scan: group 1 = bad author, group 2 = bad value
+_CONSTRAINT_RE: re.Pattern[str] = re.compile(
+    r"(foreign key constraint|is not present in table)"
+    r"|(check constraint|price must be >= 0|stock must be >= 0)",
+    re.IGNORECASE,
+)
+
+
+def _parse_cursor(cursor: str, sort: str) -> tuple[object, uuid.UUID]:
+    """Decode a keyset cursor into (sort value, id) for the current sort."""
+    try:
+        cursor_sort, value, last_id = decode_cursor(cursor)
+        if cursor_sort != sort:
+            raise ValueError("Cursor does not match sort")
+        if value is None or sort == "title":
+            return value, last_id
+        return date.fromisoformat(value), last_id
+    except ValueError as e:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Invalid cursor") from e
+
 
 @router.post("", response_model=BookRead)
-def create_book(
+async def create_book(
+    request: Request,
     data: BookCreate,
-    db: Annotated[Session, Depends(get_db_with_tenant)],
+    db: Annotated[AsyncSession, Depends(get_db_with_tenant)],
 ):
     try:
-        return BookService.create_book(db, data)
+        book = await BookService.create_book(db, data)
     except ValueError as e:
         raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         # Handle database constraint violations
-        error_msg = str(e).lower()
-        if "foreign key constraint" in error_msg or "is not present in table" in error_msg:
+        error_msg = str(e)
+        match = _CONSTRAINT_RE.search(error_msg)
+        if match is None:
+            raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=f"Database constraint violation: {error_msg}")
+        elif match.lastindex == 1:
             raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Invalid author_id - author does not exist")
-        elif "check constraint" in error_msg or "price must be >= 0" in error_msg or "stock must be >= 0" in error_msg:
-            raise HTTPException(status_code=HTTP_422_UNPROCESSABLE_CONTENT, detail=str(e))
         else:
-            raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=f"Database constraint violation: {str(e)}")
+            raise HTTPException(status_code=HTTP_422_UNPROCESSABLE_CONTENT, detail=error_msg)
+    await invalidate(request.state.tenant, "books")
+    return book
+
+
+@router.post("/bulk", response_model=list[BookRead])
+async def create_books(
+    request: Request,
+    data: Annotated[list[BookCreate], Body(min_length=1, max_length=_MAX_BULK_BOOKS)],
+    db: Annotated[AsyncSession, Depends(get_db_with_tenant)],
+):
+    """
+    Create books in one INSERT. All or nothing: a duplicate or unknown
+    author fails the whole batch through the integrity error handler.
+    """
+    books = await BookService.create_books(db, data)
+    await invalidate(request.state.tenant, "books")
+    return books
 
 
 @router.get("", response_model=list[BookRead])
-def list_books(
-    db: Annotated[Session, Depends(get_db_with_tenant)],
+async def list_books(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_db_with_tenant)],
     author_id: Annotated[uuid.UUID | None, Query()] = None,
     q: Annotated[str | None, Query()] = None,
     sort: Annotated[str, Query(pattern="^(title|published_at)$")] = "title",
     limit: Annotated[int, Query(ge=1, le=100)] = 20,
     offset: Annotated[int, Query(ge=0)] = 0,
+    cursor: Annotated[str | None, Query(description="X-Next-Cursor of the previous page")] = None,
+):
+    # Pages are capped at 100 rows and the body is cached as one blob, so it
+    # is rendered in a single pass rather than streamed from a server-side
+    # cursor (which would add a round-trip per fetched batch).
+    after = _parse_cursor(cursor, sort) if cursor else None
+
+    async def render() -> tuple[bytes, dict[str, str]]:
+        books = await BookService.list_book_rows(
+            db,
+            author_id=author_id,
+            q=q,
+            sort=sort,
+            limit=limit,
+            offset=offset,
+            after=after,
+        )
+        headers: dict[str, str] = {}
+        if len(books) == limit:
+            last = books[-1]
+            value = last[sort]
+            headers["X-Next-Cursor"] = encode_cursor(
+                sort, None if value is None else str(value), last["id"]
+            )
+        return _BOOK_LIST.dump_json(_BOOK_LIST.validate_python(books)), headers
+
+    return await cached_response(request, "books", render)
+
+
+@router.get("/{book_id}", response_model=BookRead)
+async def get_book(
+    db: Annotated[AsyncSession, Depends(get_db_with_tenant)],
+    book_id: Annotated[uuid.UUID, Path(..., description="Book ID")],
 ):
-    return BookService.list_books(
-        db,
-        author_id=author_id,
-        q=q,
-        sort=sort,
-        limit=limit,
-        offset=offset,
-    )
+    # Not cached: callers read it back for current stock after confirming orders
+    return await BookService.get_book(db, book_id)
@@ -1,24 +1,44 @@
-from fastapi import APIRouter, Depends, Header, Path
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, Path, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
 import uuid
 
+from app.core.cache import claim_idempotency, release_idempotency, store_idempotency
 from app.db.session import get_db_with_tenant
-from app.schemas.order import OrderCreate, OrderRead
+from app.schemas.order import OrderConfirmRead, OrderCreate, OrderRead
 from app.services.order_service import OrderService
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 
 @router.post("", response_model=OrderRead)
-def create_order(data: OrderCreate, db: Annotated[Session, Depends(get_db_with_tenant)]):
-    return OrderService.create_order(db, data)
+async def create_order(data: OrderCreate, db: Annotated[AsyncSession, Depends(get_db_with_tenant)]):
+    return await OrderService.create_order(db, data)
 
 
-@router.post("/{order_id}/confirm")
-def confirm_order(
-    db: Annotated[Session, Depends(get_db_with_tenant)],
+@router.post("/{order_id}/confirm", response_model=OrderConfirmRead)
+async def confirm_order(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_db_with_tenant)],
     order_id: Annotated[uuid.UUID, Path(..., description="Order ID to confirm")],
     idempotency_key: Annotated[str | None, Header()] = None,
 ):
-    return OrderService.confirm_order(db, order_id, idempotency_key)
+    tenant: str = request.state.tenant
+    if not idempotency_key:
+        return await OrderService.confirm_order(db, order_id, None)
+
+    # Replay a completed confirmation from Redis; the DB table stays the durable record
+    claimed, body = await claim_idempotency(tenant, idempotency_key)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+
+    try:
+        result = await OrderService.confirm_order(db, order_id, idempotency_key)
+    except Exception:
+        if claimed:
+            await release_idempotency(tenant, idempotency_key)
+        raise
+
+    body = OrderConfirmRead.model_validate(result).model_dump_json().encode()
+    await store_idempotency(tenant, idempotency_key, body)
+    return Response(content=body, media_type="application/json")
@@ -1,41 +1,54 @@
+import re
 from fastapi import APIRouter, HTTPException
-from sqlalchemy import text
+from sqlalchemy import Dialect, text
+from sqlalchemy.schema import CreateIndex, CreateTable, ExecutableDDLElement
+from app.core.middleware_tenant import register_tenant
 from app.db.session import engine
 from app.models.base import Base
+from app.schemas.tenant import TenantBootstrapRead
 from starlette.status import (
     HTTP_400_BAD_REQUEST,
 )
 
 router = APIRouter(prefix="/tenants", tags=["tenants"])
 
+# Valid tenant (schema) names
+_TENANT_RE: re.Pattern[str] = re.compile(r'[A-Za-z0-9_-]+')
 
-@router.post("/{tenant}/bootstrap")
-def bootstrap_tenant(tenant: str):
+
+def _schema_ddl(tenant: str, dialect: Dialect) -> str:
+    """
+    CREATE TABLE/INDEX IF NOT EXISTS for every model, in the tenant schema,
+    as one script. Replaces create_all, which checks and creates each table
+    and index in its own round-trip.
+    """
+    statements: list[ExecutableDDLElement] = []
+    for table in Base.metadata.sorted_tables:
+        statements.append(CreateTable(table, if_not_exists=True))
+        statements.extend(CreateIndex(index, if_not_exists=True) for index in table.indexes)
+    return ";\n".join(
+        str(ddl.compile(dialect=dialect, schema_translate_map={None: tenant}, render_schema_translate=True))
+        for ddl in statements
+    )
+
+
+@router.post("/{tenant}/bootstrap", response_model=TenantBootstrapRead)
+async def bootstrap_tenant(tenant: str):
     # Allow alphanumeric, hyphens, and underscores (common in tenant names)
-    import re
-    if not re.match(r'^[a-zA-Z0-9_-]+$', tenant):
+    if not _TENANT_RE.fullmatch(tenant):
         raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Invalid tenant name")
     if not tenant or len(tenant) > 63:
         raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Tenant name must be 1-63 characters")
 
-    with engine.begin() as conn:
-        _ = conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{tenant}"'))
-        _ = conn.execute(text("CREATE EXTENSION IF NOT EXISTS citext"))
-        _ = conn.execute(text(f'SET search_path TO "{tenant}", public'))
-
-        # Create tables without modifying global metadata
-        original_schemas: dict[str, str | None] = {}
-        try:
-            # Backup original schemas
-            for table_name, table in Base.metadata.tables.items():
-                original_schemas[table_name] = table.schema
-                table.schema = tenant
-
-            Base.metadata.create_all(bind=conn)
-        finally:
-            # Restore original schemas
-            for table_name, original_schema in original_schemas.items():
-                if table_name in Base.metadata.tables:
-                    Base.metadata.tables[table_name].schema = original_schema
+    async with engine.begin() as conn:
+        _ = await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{tenant}"'))
+        _ = await conn.execute(text("CREATE EXTENSION IF NOT EXISTS citext"))
+        _ = await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+        # Send all tables and indexes as one script, in the open transaction
+        raw = await conn.get_raw_connection()
+        _ = await raw.driver_connection.execute(_schema_ddl(tenant, conn.dialect))
+
+    register_tenant(tenant)
 
     return {"status": "ok", "tenant": tenant}
@@ -0,0 +1,151 @@
+import json
+import logging
+from collections.abc import Awaitable, Callable
+from typing import cast
+from urllib.parse import urlencode
+from fastapi import Request, Response
+from app.core.config import settings
+
+try:
+    from redis.asyncio import Redis
+except ImportError:  # redis is optional; caching is disabled without it
+    Redis = None
+
+logger = logging.getLogger(__name__)
+
+# Shared client; None when REDIS_URL is unset or redis is not installed
+_client = (
+    Redis.from_url(settings.REDIS_URL)
+    if Redis is not None and settings.REDIS_URL
+    else None
+)
+
+# Marker held in an idempotency slot while the first request is in flight
+_PENDING = b"pending"
+
+
+def cache_key(request: Request, resource: str, generation: int = 0) -> str:
+    """
+    <tenant>:<resource>:<generation>:<sorted query string>
+    """
+    params = urlencode(sorted(request.query_params.multi_items()))
+    return f"{request.state.tenant}:{resource}:{generation}:{params}"
+
+
+def _generation_key(tenant: str, resource: str) -> str:
+    return f"gen:{tenant}:{resource}"
+
+
+async def _get_generation(tenant: str, resource: str) -> int | None:
+    """Current generation of a tenant's resource; None when caching is off or Redis fails."""
+    if _client is None:
+        return None
+    try:
+        generation = await _client.get(_generation_key(tenant, resource))
+    except Exception:
+        logger.warning("Cache read failed", exc_info=True)
+        return None
+    return int(generation) if generation is not None else 0
+
+
+async def get_cached(key: str) -> bytes | None:
+    """Cached body for key; misses and Redis errors return None."""
+    if _client is None:
+        return None
+    try:
+        return await _client.get(key)
+    except Exception:
+        logger.warning("Cache read failed", exc_info=True)
+        return None
+
+
+async def set_cached(key: str, body: bytes, ttl: int | None = None) -> None:
+    """Store body under key for ttl seconds (default CACHE_TTL_SECONDS)."""
+    if _client is None:
+        return
+    try:
+        _ = await _client.set(key, body, ex=ttl or settings.CACHE_TTL_SECONDS)
+    except Exception:
+        logger.warning("Cache write failed", exc_info=True)
+
+
+async def invalidate(tenant: str, resource: str) -> None:
+    """
+    Bump the generation of a tenant's resource; entries keyed to older
+    generations are never read again and expire with their TTL.
+    """
+    if _client is None:
+        return
+    try:
+        _ = await _client.incr(_generation_key(tenant, resource))
+    except Exception:
+        logger.warning("Cache invalidation failed", exc_info=True)
+
+
+async def cached_response(
+    request: Request,
+    resource: str,
+    render: Callable[[], Awaitable[tuple[bytes, dict[str, str]]]],
+) -> Response:
+    """
+    Serve a JSON body and its extra headers from the cache, or render and
+    store them on a miss. Stored as <headers JSON>\n<body>.
+    """
+    generation = await _get_generation(request.state.tenant, resource)
+    if generation is None:
+        body, headers = await render()
+        return Response(content=body, media_type="application/json", headers=headers)
+    key = cache_key(request, resource, generation)
+    cached = await get_cached(key)
+    if cached is None:
+        body, headers = await render()
+        await set_cached(key, json.dumps(headers).encode() + b"\n" + body)
+    else:
+        raw_headers, _, body = cached.partition(b"\n")
+        headers = cast(dict[str, str], json.loads(raw_headers))
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _idempotency_key(tenant: str, key: str) -> str:
+    return f"idem:{tenant}:{key}"
+
+
+async def claim_idempotency(tenant: str, key: str) -> tuple[bool, bytes | None]:
+    """
+    SET NX a pending marker for an Idempotency-Key.
+    Returns (claimed, stored response body); the body is set only when an
+    earlier request with this key already completed.
+    """
+    if _client is None:
+        return (False, None)
+    redis_key = _idempotency_key(tenant, key)
+    try:
+        if await _client.set(redis_key, _PENDING, nx=True, ex=settings.IDEMPOTENCY_TTL_SECONDS):
+            return (True, None)
+        body = await _client.get(redis_key)
+    except Exception:
+        logger.warning("Idempotency claim failed", exc_info=True)
+        return (False, None)
+    if body is None or body == _PENDING:
+        return (False, None)
+    return (False, body)
+
+
+async def store_idempotency(tenant: str, key: str, body: bytes) -> None:
+    """Replace the pending marker with the final response body."""
+    await set_cached(_idempotency_key(tenant, key), body, ttl=settings.IDEMPOTENCY_TTL_SECONDS)
+
+
+async def release_idempotency(tenant: str, key: str) -> None:
+    """Drop a pending marker so the request can be retried."""
+    if _client is None:
+        return
+    try:
+        _ = await _client.delete(_idempotency_key(tenant, key))
+    except Exception:
+        logger.warning("Idempotency release failed", exc_info=True)
+
+
+async def close_cache() -> None:
+    if _client is not None:
+        await _client.aclose()
@@ -1,7 +1,8 @@
-from collections.abc import Mapping, Sequence
-from typing import Any,  cast
+import logging
+import re
+from collections.abc import Awaitable, Callable
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.status import (
@@ -10,9 +11,23 @@ from starlette.status import (
     HTTP_500_INTERNAL_SERVER_ERROR,
 )
 from pydantic import BaseModel
+from pydantic_core import to_json
 from sqlalchemy.exc import IntegrityError
 
-from app.core.logging import get_logger
+logger = logging.getLogger(__name__)
+
+# Meta for requests that never passed through the middlewares
+_NO_CONTEXT: dict[str, str] = {"request_id": "-", "tenant": "-"}
+
+# Constraint kinds matched in one case-insensitive scan, keyed by group number
+_INTEGRITY_RE: re.Pattern[str] = re.compile(
+    r"(foreign key constraint)|(unique constraint)|(check constraint)", re.IGNORECASE
+)
+_INTEGRITY_ERRORS: dict[int, tuple[str, str]] = {
+    1: ("Referenced resource not found", "reference_not_found"),
+    2: ("Resource already exists", "duplicate_resource"),
+    3: ("Invalid data value", "invalid_value"),
+}
 
 
 class ErrorBody(BaseModel):
@@ -23,119 +38,118 @@ class ErrorBody(BaseModel):
 
 
 class ErrorEnvelope(BaseModel):
+    """
+    Error response shape, documented in OpenAPI through ERROR_RESPONSES;
+    rendered as a plain dict by `_error_response`.
+    """
     error: ErrorBody
     meta: dict[str, object]
 
 
+# OpenAPI responses for every API route; "4XX" also replaces FastAPI's
+# default 422 schema, which the validation handler does not return
+ERROR_RESPONSES: dict[int | str, dict[str, object]] = {
+    "4XX": {"model": ErrorEnvelope, "description": "Client error"},
+    "5XX": {"model": ErrorEnvelope, "description": "Server error"},
+}
+
+
 def _build_meta(request: Request) -> dict[str, object]:
     """Collect metadata for error responses."""
     return {
-        "request_id": getattr(request.state, "correlation_id", "-"),
-        "tenant": getattr(request.state, "tenant", "-"),
+        **getattr(request.state, "ctx", _NO_CONTEXT),
         "path": request.url.path,
         "method": request.method,
     }
 
-def _serialize_validation_errors(errors: Sequence[Mapping[Any, Any]]) -> list[dict[str, object]]:
-    """Serialize validation errors, handling non-serializable objects in context."""
+def _error_response(
+    request: Request,
+    status_code: int,
+    error_type: str,
+    message: str,
+    details: dict[str, object] | None = None,
+) -> Response:
+    """
+    Render an ErrorEnvelope-shaped dict to JSON with pydantic-core.
+    The shape is built here, so the models are not instantiated/validated;
+    values JSON can't hold (e.g. a validator's exception in ctx) become str.
+    """
+    body = {
+        "error": {"type": error_type, "message": message, "details": details},
+        "meta": _build_meta(request),
+    }
+    return Response(
+        content=to_json(body, fallback=str),
+        status_code=status_code,
+        media_type="application/json",
+    )
+
+async def _http_exception_handler(
+    request: Request, exc: StarletteHTTPException
+) -> Response:
+    logger.warning("HTTP error", extra={"status_code": exc.status_code})
+    # Handle complex detail objects (like shortages)
+    if isinstance(exc.detail, dict):
+        # Short dicts double as the message; long ones only go in details
+        text = str(exc.detail)
+        message = text if len(text) < 200 else "Request failed"
+        details = exc.detail
+    else:
+        message = exc.detail or "HTTP error"
+        details = None
+
+    return _error_response(request, exc.status_code, "http_error", message, details)
+
+
+async def _validation_exception_handler(
+    request: Request, exc: RequestValidationError
+) -> Response:
+    logger.info("Validation error")
+    return _error_response(
+        request,
+        HTTP_422_UNPROCESSABLE_CONTENT,
+        "validation_error",
+        "Invalid request payload",
+        {"errors": exc.errors()},
+    )
+
+
+async def _integrity_error_handler(request: Request, exc: IntegrityError) -> Response:
+    # str(exc) renders the statement and params; skip it when WARNING is off
+    if logger.isEnabledFor(logging.WARNING):
+        logger.warning("Database integrity error", extra={"error": str(exc)})
 
-    serialized_errors: list[dict[str, object]] = []
+    # Extract meaningful error message
+    error_message = str(exc.orig) if hasattr(exc, 'orig') and exc.orig else str(exc)
 
-    for error in errors:
-        serialized_error: dict[str, object] = dict(error)
+    # Check for specific constraint violations
+    match = _INTEGRITY_RE.search(error_message)
+    if match is not None and match.lastindex is not None:
+        message, error_type = _INTEGRITY_ERRORS[match.lastindex]
+    else:
+        message = "Data integrity violation"
+        error_type = "integrity_error"
 
-        if "ctx" in serialized_error and isinstance(serialized_error["ctx"], dict):
-            ctx: dict[str, object] = cast(dict[str, object], serialized_error["ctx"]).copy()
+    return _error_response(request, HTTP_400_BAD_REQUEST, error_type, message)
 
-            if "error" in ctx:
-                error_value = ctx["error"]
 
-                if hasattr(error_value, "__str__"):
-                    ctx["error"] = str(error_value)
-            serialized_error["ctx"] = ctx
-        serialized_errors.append(serialized_error)
-    return serialized_errors
+async def _unhandled_exception_handler(request: Request, exc: Exception) -> Response:
+    logger.exception("Unhandled server error", exc_info=exc)
+    return _error_response(
+        request, HTTP_500_INTERNAL_SERVER_ERROR, "server_error", "Internal Server Error"
+    )
 
 
-def register_exception_handlers(app: FastAPI) -> None:
-    """Register centralized exception."""
+# Registered once per app by `register_exception_handlers`
+_HANDLERS: tuple[tuple[type[Exception], Callable[..., Awaitable[Response]]], ...] = (
+    (StarletteHTTPException, _http_exception_handler),
+    (RequestValidationError, _validation_exception_handler),
+    (IntegrityError, _integrity_error_handler),
+    (Exception, _unhandled_exception_handler),
+)
 
-    @app.exception_handler(StarletteHTTPException)
-    async def http_exception_handler(
-        request: Request, exc: StarletteHTTPException
-    ) -> JSONResponse:
-        logger = get_logger(__name__, request)
-        logger.warning("HTTP error", extra={"status_code": exc.status_code})
-        # Handle complex detail objects (like shortages)
-        if isinstance(exc.detail, dict):
-            message = str(exc.detail) if len(str(exc.detail)) < 200 else "Request failed"
-            details = exc.detail
-        else:
-            message = exc.detail or "HTTP error"
-            details = None
-
-        body = ErrorEnvelope(
-            error=ErrorBody(type="http_error", message=message, details=details),
-            meta=_build_meta(request),
-        )
-        return JSONResponse(status_code=exc.status_code, content=body.model_dump())
-
-    @app.exception_handler(RequestValidationError)
-    async def validation_exception_handler(
-        request: Request, exc: RequestValidationError
-    ) -> JSONResponse:
-        logger = get_logger(__name__, request)
-        logger.info("Validation error")
-        body = ErrorEnvelope(
-            error=ErrorBody(
-                type="validation_error",
-                message="Invalid request payload",
-                details={"errors": _serialize_validation_errors(exc.errors())},
-            ),
-            meta=_build_meta(request),
-        )
-        return JSONResponse(
-            status_code=HTTP_422_UNPROCESSABLE_CONTENT, content=body.model_dump()
-        )
-
-    @app.exception_handler(IntegrityError)
-    async def integrity_error_handler(request: Request, exc: IntegrityError) -> JSONResponse:
-        logger = get_logger(__name__, request)
-        logger.warning("Database integrity error", extra={"error": str(exc)})
 
-        # Extract meaningful error message
-        error_message = str(exc.orig) if hasattr(exc, 'orig') and exc.orig else str(exc)
-
-        # Check for specific constraint violations
-        if "foreign key constraint" in error_message.lower():
-            message = "Referenced resource not found"
-            error_type = "reference_not_found"
-        elif "unique constraint" in error_message.lower():
-            message = "Resource already exists"
-            error_type = "duplicate_resource"
-        elif "check constraint" in error_message.lower():
-            message = "Invalid data value"
-            error_type = "invalid_value"
-        else:
-            message = "Data integrity violation"
-            error_type = "integrity_error"
-
-        body = ErrorEnvelope(
-            error=ErrorBody(type=error_type, message=message),
-            meta=_build_meta(request),
-        )
-        return JSONResponse(
-            status_code=HTTP_400_BAD_REQUEST, content=body.model_dump()
-        )
-
-    @app.exception_handler(Exception)
-    async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONResponse:
-        logger = get_logger(__name__, request)
-        logger.exception("Unhandled server error", exc_info=exc)
-        body = ErrorEnvelope(
-            error=ErrorBody(type="server_error", message="Internal Server Error"),
-            meta=_build_meta(request),
-        )
-        return JSONResponse(
-            status_code=HTTP_500_INTERNAL_SERVER_ERROR, content=body.model_dump()
-        )
+def register_exception_handlers(app: FastAPI) -> None:
+    """Register centralized exception."""
+    for exc_class, handler in _HANDLERS:
+        app.add_exception_handler(exc_class, handler)
@@ -1,28 +1,32 @@
 import logging
 import sys
+from contextvars import ContextVar
 from typing import Final
-from collections.abc import Mapping
-from logging import LoggerAdapter, LogRecord
+from logging import LogRecord
 from typing_extensions import override
-from fastapi import Request
 
 _LOG_FORMAT: Final[str] = (
     "%(asctime)s %(levelname)s %(name)s :: %(message)s "
     "[req=%(request_id)s tenant=%(tenant)s]"
 )
 
+# Per-request context, set by the middlewares and read by RequestLogFilter
+REQUEST_ID: ContextVar[str] = ContextVar("request_id", default="-")
+TENANT: ContextVar[str] = ContextVar("tenant", default="-")
+
 
 class RequestLogFilter(logging.Filter):
     """
-    Ensures every record has request_id and tenant keys.
+    Stamps every record with the current request_id and tenant
+    (explicit `extra` values win).
     """
 
     @override
     def filter(self, record: LogRecord) -> bool:
         if not hasattr(record, "request_id"):
-            record.request_id = "-"
+            record.request_id = REQUEST_ID.get()
         if not hasattr(record, "tenant"):
-            record.tenant = "-"
+            record.tenant = TENANT.get()
         return True
 
 
@@ -45,17 +49,3 @@ def setup_logging(level: int = logging.INFO) -> None:
         lg.handlers.clear()
         lg.setLevel(level)
         lg.addHandler(handler)
-
-def get_logger(
-    name: str,
-    request: Request | None = None
-) -> LoggerAdapter[logging.Logger]:
-    """
-    Attach request context (request_id, tenant).
-    Usage: logger = get_logger(__name__, request)
-    """
-    extra: Mapping[str, str] = {}
-    if request is not None:
-        extra["request_id"] = getattr(request.state, "correlation_id", "-")
-        extra["tenant"] = getattr(request.state, "tenant", "-")
-    return LoggerAdapter(logging.getLogger(name), extra)
@@ -1,25 +1,34 @@
-from typing_extensions import override
 import uuid
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
-from starlette.requests import Request
-from starlette.responses import Response
-from typing import Callable
-from collections.abc import Awaitable
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.logging import REQUEST_ID
+
+class CorrelationIdMiddleware:
+    """
+    Reads or generates X-Request-ID (pure ASGI).
+    - Sets `request.state.correlation_id` and `request.state.ctx`
+    - Echoes the id on the response
+    """
 
-class CorrelationIdMiddleware(BaseHTTPMiddleware):
     def __init__(self, app: ASGIApp, header_name: str = "X-Request-ID"):
-        super().__init__(app)
+        self.app: ASGIApp = app
         self.header_name: str = header_name
 
-    @override
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Awaitable[Response]]
-    ):
-        corr_id = request.headers.get(self.header_name) or str(uuid.uuid4())
-        request.state.correlation_id = corr_id
-        response = await call_next(request)
-        response.headers[self.header_name] = corr_id
-        return response
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        corr_id = Headers(scope=scope).get(self.header_name) or str(uuid.uuid4())
+        state = scope.setdefault("state", {})
+        state["correlation_id"] = corr_id
+        # Shared log/error context; TenantMiddleware fills in the tenant
+        state["ctx"] = {"request_id": corr_id, "tenant": "-"}
+        _ = REQUEST_ID.set(corr_id)
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[self.header_name] = corr_id
+            await send(message)
+
+        await self.app(scope, receive, send_with_id)
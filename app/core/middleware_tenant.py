@@ -1,145 +1,150 @@
-from collections.abc import Awaitable
-from typing import Callable
-from fastapi import Response
-from typing_extensions import override
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+import re
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.responses import JSONResponse
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from sqlalchemy import text
-from sqlalchemy.exc import SQLAlchemyError
 from starlette.status import (
     HTTP_400_BAD_REQUEST,
     HTTP_404_NOT_FOUND
 )
 from app.db.session import engine
+from app.core.logging import TENANT
 
+# Valid tenant (schema) names
+_TENANT_RE: re.Pattern[str] = re.compile(r'[A-Za-z0-9_-]+')
 
-def _schema_exists(tenant: str) -> bool:
-    with engine.connect() as conn:
-        result = conn.execute(
-            text("SELECT 1 FROM information_schema.schemata WHERE schema_name = :s"),
-            {"s": tenant},
+# Paths served without a tenant
+_SKIP_PATHS: frozenset[str] = frozenset(
+    {"/", "/docs", "/redoc", "/openapi.json", "/api/v1/openapi.json"}
+)
+
+# /api/v1/tenants/{tenant}/bootstrap; the name is validated separately
+_BOOTSTRAP_RE: re.Pattern[str] = re.compile(r"/api/v1/tenants/([^/]*)/bootstrap/?")
+
+# Tenants whose schema is known to exist; filled on first lookup and on bootstrap
+_KNOWN_TENANTS: set[str] = set()
+
+
+# Record a tenant whose schema has been created or verified.
+def register_tenant(tenant: str) -> None:
+    _KNOWN_TENANTS.add(tenant)
+
+
+async def _schema_exists(tenant: str) -> bool:
+    async with engine.connect() as conn:
+        result = (
+            await conn.execute(
+                text("SELECT 1 FROM information_schema.schemata WHERE schema_name = :s"),
+                {"s": tenant},
+            )
         ).first()
         return bool(result)
 
 
-class TenantMiddleware(BaseHTTPMiddleware):
+class TenantMiddleware:
     """
-    Reads X-Tenant header.
+    Reads X-Tenant header (pure ASGI).
     - 400 if missing
     - 404 if schema not found
     - Sets `request.state.tenant`
-    - Sets search_path to `<tenant>, public`
     """
 
     def __init__(self, app: ASGIApp, header_name: str = "X-Tenant"):
-        super().__init__(app)
+        self.app: ASGIApp = app
         self.header_name: str = header_name
 
-    @override
-    async def dispatch(
-          self,
-          request: Request,
-          call_next: Callable[[Request], Awaitable[Response]],
-      ) -> Response:
+    @staticmethod
+    def _set_tenant(state: dict[str, object], tenant: str) -> None:
+        state["tenant"] = tenant
+        _ = TENANT.set(tenant)
+        ctx = state.get("ctx")
+        if isinstance(ctx, dict):
+            ctx["tenant"] = tenant
+
+    @staticmethod
+    def _error(
+        state: dict[str, object], status_code: int, error_type: str, message: str, tenant: str
+    ) -> JSONResponse:
+        return JSONResponse(
+            status_code=status_code,
+            content={
+                "error": {
+                    "type": error_type,
+                    "message": message,
+                },
+                "meta": {
+                    "request_id": state.get("correlation_id", "-"),
+                    "tenant": tenant,
+                },
+            },
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path: str = scope["path"]
+        state: dict[str, object] = scope.setdefault("state", {})
+
         # Skip tenant validation
-        if request.url.path in ["/", "/docs", "/redoc", "/openapi.json", "/api/v1/openapi.json"]:
-            request.state.tenant = "default"
-            response = await call_next(request)
-            return response
+        if path in _SKIP_PATHS:
+            self._set_tenant(state, "default")
+            await self.app(scope, receive, send)
+            return
 
-        if "/bootstrap" in request.url.path:
+        if path.endswith(("/bootstrap", "/bootstrap/")):
             # Extract tenant from URL path /api/v1/tenants/{tenant}/bootstrap
-            path_parts = request.url.path.strip("/").split("/")
-            if len(path_parts) >= 4 and path_parts[0] == "api" and path_parts[1] == "v1" and path_parts[2] == "tenants":
-                tenant = path_parts[3]
+            match = _BOOTSTRAP_RE.fullmatch(path)
+            if match:
+                tenant = match.group(1)
                 # Allow alphanumeric, hyphens, and underscores (common in tenant names)
-                import re
-                if not re.match(r'^[a-zA-Z0-9_-]+$', tenant):
-                    return JSONResponse(
-                        status_code=HTTP_400_BAD_REQUEST,
-                        content={
-                            "error": {
-                                "type": "validation_error",
-                                "message": "Invalid tenant name",
-                            },
-                            "meta": {
-                                "request_id": getattr(request.state, "correlation_id", "-"),
-                                "tenant": tenant,
-                            },
-                        },
+                if not _TENANT_RE.fullmatch(tenant):
+                    response = self._error(
+                        state, HTTP_400_BAD_REQUEST, "validation_error", "Invalid tenant name", tenant
                     )
+                    await response(scope, receive, send)
+                    return
                 if not tenant or len(tenant) > 63:
-                    return JSONResponse(
-                        status_code=HTTP_400_BAD_REQUEST,
-                        content={
-                            "error": {
-                                "type": "validation_error",
-                                "message": "Tenant name must be 1-63 characters",
-                            },
-                            "meta": {
-                                "request_id": getattr(request.state, "correlation_id", "-"),
-                                "tenant": tenant,
-                            },
-                        },
+                    response = self._error(
+                        state,
+                        HTTP_400_BAD_REQUEST,
+                        "validation_error",
+                        "Tenant name must be 1-63 characters",
+                        tenant,
                     )
+                    await response(scope, receive, send)
+                    return
                 # Set tenant from URL and proceed
-                request.state.tenant = tenant
-                response = await call_next(request)
-                return response
+                self._set_tenant(state, tenant)
+                await self.app(scope, receive, send)
+                return
 
-        tenant = request.headers.get(self.header_name)
+        tenant = Headers(scope=scope).get(self.header_name)
 
         if not tenant:
-            return JSONResponse(
-                status_code=HTTP_400_BAD_REQUEST,
-                content={
-                    "error": {
-                        "type": "missing_tenant",
-                        "message": "X-Tenant header is required",
-                    },
-                    "meta": {
-                        "request_id": getattr(request.state, "correlation_id", "-"),
-                        "tenant": "-",
-                    },
-                },
+            response = self._error(
+                state, HTTP_400_BAD_REQUEST, "missing_tenant", "X-Tenant header is required", "-"
             )
-        elif not _schema_exists(tenant):
-            return JSONResponse(
-                status_code=HTTP_404_NOT_FOUND,
-                content={
-                    "error": {
-                        "type": "tenant_not_found",
-                        "message": f"Tenant schema '{tenant}' not found",
-                    },
-                    "meta": {
-                        "request_id": getattr(request.state, "correlation_id", "-"),
-                        "tenant": tenant,
-                    },
-                },
+            await response(scope, receive, send)
+            return
+        elif tenant not in _KNOWN_TENANTS and not await _schema_exists(tenant):
+            response = self._error(
+                state,
+                HTTP_404_NOT_FOUND,
+                "tenant_not_found",
+                f"Tenant schema '{tenant}' not found",
+                tenant,
             )
+            await response(scope, receive, send)
+            return
 
-        try:
-            with engine.connect() as conn:
-                _ = conn.execute(text(f'SET search_path TO "{tenant}", public'))
-        except SQLAlchemyError:
-            return JSONResponse(
-                status_code=500,
-                content={
-                    "error": {
-                        "type": "tenant_context_error",
-                        "message": "Failed to set tenant search_path",
-                    },
-                    "meta": {
-                        "request_id": getattr(request.state, "correlation_id", "-"),
-                        "tenant": tenant,
-                    },
-                },
-            )
+        register_tenant(tenant)
+        self._set_tenant(state, tenant)
 
-        request.state.tenant = tenant
+        async def send_with_tenant(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[self.header_name] = tenant
+            await send(message)
 
-        response = await call_next(request)
-        response.headers[self.header_name] = tenant
-        return response
+        await self.app(scope, receive, send_with_tenant)
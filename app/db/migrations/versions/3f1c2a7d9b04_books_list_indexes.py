@@ -0,0 +1,53 @@
+"""books list indexes
+
+Revision ID: 3f1c2a7d9b04
+Revises: 9834336f304a
+Create Date: 2026-10-15 23:20:11.204518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.tenant_schemas import books_schemas
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c2a7d9b04"
+down_revision: Union[str, Sequence[str], None] = "9834336f304a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Extensions are per database; the trigram opclass must exist before any schema's index
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for schema in books_schemas(op.get_bind()):
+        op.create_index(
+            "ix_books_author_title", "books", ["author_id", "title"], schema=schema, if_not_exists=True
+        )
+        op.create_index(
+            "ix_books_author_published",
+            "books",
+            ["author_id", "published_at"],
+            schema=schema,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_books_title_trgm",
+            "books",
+            ["title"],
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+            schema=schema,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for schema in books_schemas(op.get_bind()):
+        op.drop_index("ix_books_title_trgm", table_name="books", schema=schema, if_exists=True)
+        op.drop_index("ix_books_author_published", table_name="books", schema=schema, if_exists=True)
+        op.drop_index("ix_books_author_title", table_name="books", schema=schema, if_exists=True)
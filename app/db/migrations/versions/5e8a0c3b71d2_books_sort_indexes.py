@@ -0,0 +1,35 @@
+"""books sort indexes
+
+Revision ID: 5e8a0c3b71d2
+Revises: b7e4d2a91c35
+Create Date: 2026-10-16 00:42:37.918264
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.tenant_schemas import books_schemas
+
+# revision identifiers, used by Alembic.
+revision: str = "5e8a0c3b71d2"
+down_revision: Union[str, Sequence[str], None] = "b7e4d2a91c35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for schema in books_schemas(op.get_bind()):
+        op.create_index("ix_books_title_id", "books", ["title", "id"], schema=schema, if_not_exists=True)
+        op.create_index(
+            "ix_books_published_id", "books", ["published_at", "id"], schema=schema, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for schema in books_schemas(op.get_bind()):
+        op.drop_index("ix_books_published_id", table_name="books", schema=schema, if_exists=True)
+        op.drop_index("ix_books_title_id", table_name="books", schema=schema, if_exists=True)
@@ -0,0 +1,63 @@
+"""books unique title per author per year
+
+Revision ID: b7e4d2a91c35
+Revises: 3f1c2a7d9b04
+Create Date: 2026-10-15 23:48:02.513940
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.db.tenant_schemas import books_schemas
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e4d2a91c35"
+down_revision: Union[str, Sequence[str], None] = "3f1c2a7d9b04"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Books sharing author, title and publication year (undated books count as one year)
+_DUPLICATES = """
+    SELECT count(*) FROM (
+        SELECT 1 FROM "{schema}".books
+        GROUP BY author_id, title, EXTRACT(year FROM published_at)
+        HAVING count(*) > 1
+    ) AS dup
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    for schema in books_schemas(bind):
+        # Fail with the offending schema rather than a bare index build error
+        duplicates = bind.scalar(sa.text(_DUPLICATES.format(schema=schema)))
+        if duplicates:
+            raise RuntimeError(
+                f'Schema "{schema}" has {duplicates} duplicated (author_id, title, year) '
+                "book groups; merge them before upgrading"
+            )
+        op.create_index(
+            "uq_books_author_title_year",
+            "books",
+            ["author_id", "title", sa.text("(EXTRACT(year FROM published_at))")],
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+            schema=schema,
+            if_not_exists=True,
+        )
+        # Same leading columns as the unique index, so it is redundant
+        op.drop_index("ix_books_author_title", table_name="books", schema=schema, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for schema in books_schemas(op.get_bind()):
+        op.create_index(
+            "ix_books_author_title", "books", ["author_id", "title"], schema=schema, if_not_exists=True
+        )
+        op.drop_index("uq_books_author_title_year", table_name="books", schema=schema, if_exists=True)
@@ -1,30 +1,57 @@
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker, Session
-from collections.abc import Generator
+from sqlalchemy import Connection, event, text
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from collections.abc import AsyncGenerator
 from fastapi import Request
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True, future=True)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    connect_args={
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        # SQLAlchemy's asyncpg adapter prepares through its own per-connection cache
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "server_settings": {
+            # JIT compilation only pays off for long analytical queries
+            "jit": "off",
+            # Abort runaway statements instead of pinning pooled connections
+            "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS),
+        },
+    },
+)
+AsyncSessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 
-# Get a database session with the current tenant set as the search path.
-def get_db_with_tenant(request: Request) -> Generator[Session, None, None]:
+# Scope the tenant search path to each transaction the session begins.
+@event.listens_for(Session, "after_begin")
+def _set_tenant_search_path(session: Session, _transaction: SessionTransaction, connection: Connection) -> None:
     """
-    Set search path to <tenant>, public.
+    SET LOCAL search_path to <tenant>, public for sessions carrying a tenant.
+    Re-applied on every begin so it survives commits made mid-request, and
+    reset by Postgres at transaction end so it never leaks into the pool.
     """
-    tenant = getattr(request.state, "tenant", None)
-    if tenant is None:
-        db = SessionLocal()
-        try:
-            yield db
-        finally:
-            db.close()
-        return
+    tenant = session.info.get("tenant")
+    if tenant is not None:
+        _ = connection.execute(
+            text("SELECT set_config('search_path', :path, true)"),
+            {"path": f'"{tenant}", public'},
+        )
+
 
-    db = SessionLocal()
-    try:
-        _ = db.execute(text(f'SET search_path TO "{tenant}", public'))
+# Get a database session bound to the current tenant.
+async def get_db_with_tenant(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Tag the session with the request tenant; the search path is applied
+    per transaction by `_set_tenant_search_path`.
+    """
+    tenant = getattr(request.state, "tenant", None)
+    async with AsyncSessionLocal() as db:
+        if tenant is not None:
+            db.info["tenant"] = tenant
 
         yield db
-    finally:
-        db.close()
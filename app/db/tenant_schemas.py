@@ -0,0 +1,24 @@
+"""
+Schema discovery for migrations. Alembic runs against the default search_path
+(public), but every bootstrapped tenant has its own copy of the tables, so
+table-level changes must be repeated in each schema.
+"""
+from sqlalchemy import Connection, text
+
+# Schemas named by the tenant rule (see the bootstrap route) that hold a books table
+_BOOKS_SCHEMAS = text(
+    """
+    SELECT n.nspname
+    FROM pg_namespace n
+    JOIN pg_class c ON c.relnamespace = n.oid
+    WHERE c.relname = 'books'
+      AND c.relkind = 'r'
+      AND n.nspname ~ '^[A-Za-z0-9_-]+$'
+    ORDER BY n.nspname
+    """
+)
+
+
+def books_schemas(conn: Connection) -> list[str]:
+    """public (once the init migration ran) plus every bootstrapped tenant schema."""
+    return list(conn.scalars(_BOOKS_SCHEMAS).all())
@@ -1,10 +1,14 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.db.session import engine
+from app.core.cache import close_cache
 from app.core.middleware_tenant import TenantMiddleware
 from app.core.middleware_correlation import CorrelationIdMiddleware
 from app.core.logging import setup_logging
-from app.core.errors import register_exception_handlers
+from app.core.errors import ERROR_RESPONSES, register_exception_handlers
 
 
 # Routers
@@ -17,12 +21,21 @@ from app.api.routes.orders import router as orders_router
 
 setup_logging()
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    yield
+    # Close pooled connections on shutdown
+    await engine.dispose()
+    await close_cache()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="Books Orders API - A multi-tenant API for managing books, authors, and orders.",
     version="1.0.0",
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
-
+    lifespan=lifespan,
 )
 
 # CORS middleware - allow docs UI to make API requests
@@ -65,7 +78,7 @@ async def root():
 register_exception_handlers(app)
 
 # Mount routers
-api = APIRouter(prefix=settings.API_V1_STR)
+api = APIRouter(prefix=settings.API_V1_STR, responses=ERROR_RESPONSES)
 api.include_router(tenants_router)
 api.include_router(authors_router)
 api.include_router(books_router)
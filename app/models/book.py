@@ -1,9 +1,10 @@
-from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import ForeignKey, Numeric, Integer, Date, CheckConstraint, Text, Constraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import ForeignKey, Numeric, Integer, Date, CheckConstraint, Text, Constraint, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from decimal import Decimal
 from app.models.base import Base
+from app.models.author import Author
 
 #Book
 class Book(Base):
@@ -29,7 +30,32 @@ class Book(Base):
         server_default="1",
         comment="for optimistic locking",
     )
-    __table_args__: tuple[Constraint, ...] = (
+    # Must be eager-loaded explicitly (selectinload); lazy access raises
+    author: Mapped[Author] = relationship(lazy="raise")
+    __table_args__: tuple[Constraint | Index, ...] = (
             CheckConstraint("price >= 0", name="books_price_nonneg"),
             CheckConstraint("stock >= 0", name="books_stock_nonneg"),
+            # One title per author per publication year, undated books
+            # included (ON CONFLICT target; NULLS NOT DISTINCT needs PG 15+).
+            # Also serves the author filter ordered by title.
+            Index(
+                "uq_books_author_title_year",
+                "author_id",
+                "title",
+                text("(EXTRACT(year FROM published_at))"),
+                unique=True,
+                postgresql_nulls_not_distinct=True,
+            ),
+            # list_books: all books, ordered (and keyset-paged) by (sort key, id)
+            Index("ix_books_title_id", "title", "id"),
+            Index("ix_books_published_id", "published_at", "id"),
+            # list_books: filter by author, ordered by published_at
+            Index("ix_books_author_published", "author_id", "published_at"),
+            # list_books: ILIKE '%q%' title search (requires pg_trgm)
+            Index(
+                "ix_books_title_trgm",
+                "title",
+                postgresql_using="gin",
+                postgresql_ops={"title": "gin_trgm_ops"},
+            ),
     )
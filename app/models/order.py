@@ -1,7 +1,7 @@
 from __future__ import annotations
 import uuid
 import datetime
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import (
     Text,
     ForeignKey,
@@ -30,6 +30,15 @@ class Order(Base):
         nullable=False,
         server_default=func.now(),
     )
+    # Items are batch-loaded with one SELECT ... IN per set of orders
+    items: Mapped[list[OrderItem]] = relationship(
+        back_populates="order",
+        lazy="selectin",
+        cascade="all, delete-orphan",
+    )
+
+    # Fetch created_at via RETURNING on insert instead of a later SELECT
+    __mapper_args__: dict[str, object] = {"eager_defaults": True}
 
     __table_args__: tuple[Constraint, ...] = (
         CheckConstraint(
@@ -52,6 +61,7 @@ class OrderItem(Base):
         primary_key=True,
     )
     qty: Mapped[int] = mapped_column(Integer, nullable=False)
+    order: Mapped[Order] = relationship(back_populates="items")
 
     __table_args__: tuple[Constraint, ...] = (
         CheckConstraint("qty > 0", name="order_items_qty_positive"),
@@ -1,42 +1,58 @@
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import Integer, bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.author import Author
 from app.schemas.author import AuthorCreate
 from app.utils.pagination import clamp_pagination
 
+# Reused list statements, so the compiled SQL cache is hit directly
+_LIST_AUTHORS_STMT = (
+    select(Author)
+    .order_by(Author.name.asc())
+    .limit(bindparam("limit", type_=Integer))
+    .offset(bindparam("offset", type_=Integer))
+)
+_SEARCH_AUTHORS_STMT = (
+    select(Author)
+    .where(Author.name.ilike(bindparam("pattern")))
+    .order_by(Author.name.asc())
+    .limit(bindparam("limit", type_=Integer))
+    .offset(bindparam("offset", type_=Integer))
+)
+
 
 class AuthorRepository:
 
     @staticmethod
     # Create a new author
-    def create(db: Session, data: AuthorCreate) -> Author:
+    async def create(db: AsyncSession, data: AuthorCreate) -> Author:
         author = Author(name=data.name, email=data.email)
         db.add(author)
-        db.commit()
-        db.refresh(author)
+        await db.commit()
+        await db.refresh(author)
         return author
 
     @staticmethod
     # List authors
-    def list(
-        db: Session,
+    async def list(
+        db: AsyncSession,
         q: str | None = None,
         limit: int = 50,
         offset: int = 0,
     ) -> list[Author]:
         limit, offset = clamp_pagination(limit, offset)
 
-        stmt = select(Author)
-
         if q:
-            stmt = stmt.where(Author.name.ilike(f"%{q.strip()}%"))
+            stmt = _SEARCH_AUTHORS_STMT
+            params: dict[str, object] = {"pattern": f"%{q.strip()}%", "limit": limit, "offset": offset}
+        else:
+            stmt = _LIST_AUTHORS_STMT
+            params = {"limit": limit, "offset": offset}
 
-        stmt = stmt.order_by(Author.name.asc()).limit(limit).offset(offset)
-        return list(db.scalars(stmt).all())
+        return list((await db.scalars(stmt, params)).all())
 
     @staticmethod
     # Get an author by email
-    def get_by_email(db: Session, email: str) -> Author | None:
+    async def get_by_email(db: AsyncSession, email: str) -> Author | None:
         stmt = select(Author).where(Author.email == email)
-        return db.scalars(stmt).first()
+        return (await db.scalars(stmt)).first()
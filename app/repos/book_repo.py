@@ -1,79 +1,224 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.book import Book
 from app.schemas.book import BookCreate
-from sqlalchemy import select, update
+from sqlalchemy import Integer, Select, bindparam, func, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import ProgrammingError
 import uuid
+from functools import lru_cache
 from app.utils.pagination import clamp_pagination
 from sqlalchemy.sql.expression import ColumnElement
-from typing import cast
+from collections.abc import Sequence
+from typing import Any, cast
+from sqlalchemy.engine import RowMapping
+
+# Sortable columns for list()
+_SORT_COLUMNS = frozenset({"title", "published_at"})
+
+_GET_BOOK_STMT = select(Book).where(Book.id == bindparam("book_id"))
+
+# SQLSTATE for "no unique or exclusion constraint matching the ON CONFLICT
+# specification": a tenant schema still waiting for uq_books_author_title_year
+_NO_CONFLICT_TARGET = "42P10"
+
+
+# Columns BookRead serializes; list_rows selects only these
+_BOOK_READ_COLUMNS = (
+    Book.id,
+    Book.title,
+    Book.author_id,
+    Book.price,
+    Book.stock,
+    Book.published_at,
+    Book.version,
+)
+
+
+@lru_cache(maxsize=None)
+def _list_books_stmt(
+    by_author: bool, search: bool, sort: str | None, after: str | None, rows: bool = False
+) -> Select[Any]:
+    """
+    Built once per filter/sort/page-mode combination and reused, so the
+    compiled SQL cache is hit without rebuilding the statement per request.
+    `after` selects keyset paging past a row whose sort key is a "value" or
+    "null"; None pages by offset. `rows` selects plain columns, not entities.
+    """
+    stmt = select(*_BOOK_READ_COLUMNS) if rows else select(Book)
+
+    # filters
+    if by_author:
+        stmt = stmt.where(Book.author_id == bindparam("author_id"))
+    if search:
+        stmt = stmt.where(Book.title.ilike(bindparam("pattern")))
+
+    # keyset: rows strictly after (sort key, id); NULL sort keys sort last
+    after_id = bindparam("after_id", type_=Book.id.type)
+    if sort is None:
+        order_by: list[ColumnElement[object]] = [cast(ColumnElement[object], Book.id)]
+        if after is not None:
+            stmt = stmt.where(Book.id > after_id)
+    else:
+        sort_column = cast(ColumnElement[object], getattr(Book, sort))
+        order_by = [sort_column, cast(ColumnElement[object], Book.id)]
+        if after == "value":
+            after_key = tuple_(sort_column, Book.id) > tuple_(
+                bindparam("after_value", type_=sort_column.type), after_id
+            )
+            if Book.__table__.c[sort].nullable:
+                after_key = or_(after_key, sort_column.is_(None))
+            stmt = stmt.where(after_key)
+        elif after == "null":
+            stmt = stmt.where(sort_column.is_(None), Book.id > after_id)
+
+    # sorting (id breaks ties so pages are stable)
+    stmt = stmt.order_by(*order_by)
+
+    # pagination
+    stmt = stmt.limit(bindparam("limit", type_=Integer))
+    if after is None:
+        stmt = stmt.offset(bindparam("offset", type_=Integer))
+    return stmt
+
+
+def _list_books_query(
+    author_id: uuid.UUID | None,
+    q: str | None,
+    sort: str,
+    limit: int,
+    offset: int,
+    after: tuple[object, uuid.UUID] | None,
+    rows: bool = False,
+) -> tuple[Select[Any], dict[str, object]]:
+    """Cached statement plus bound parameters for a list_books page."""
+    limit, offset = clamp_pagination(limit, offset)
+
+    sort_field = sort if sort in _SORT_COLUMNS else None
+    mode = None if after is None else ("null" if after[0] is None else "value")
+    stmt = _list_books_stmt(bool(author_id), bool(q), sort_field, mode, rows)
+    params: dict[str, object] = {"limit": limit}
+    if after is None:
+        params["offset"] = offset
+    else:
+        params["after_id"] = after[1]
+        if mode == "value":
+            params["after_value"] = after[0]
+    if author_id:
+        params["author_id"] = author_id
+    if q:
+        params["pattern"] = f"%{q.strip()}%"
+    return stmt, params
+
+
 class BookRepository:
     @staticmethod
 
     # Create a new book
-    def create(db: Session, data: BookCreate) -> Book:
+    async def create(db: AsyncSession, data: BookCreate) -> Book:
         book = Book(**data.model_dump())
         db.add(book)
-        db.commit()
-        db.refresh(book)
+        await db.commit()
+        await db.refresh(book)
+        return book
+
+    @staticmethod
+    # Create a book unless the author already has this title in that year
+    async def create_if_absent(db: AsyncSession, data: BookCreate) -> Book | None:
+        """
+        INSERT ... ON CONFLICT DO NOTHING RETURNING; None means a duplicate.
+        Schemas without the unique index fall back to a count(*) pre-check.
+        """
+        stmt = (
+            insert(Book)
+            .values(**data.model_dump())
+            .on_conflict_do_nothing(
+                index_elements=[Book.author_id, Book.title, func.extract("year", Book.published_at)]
+            )
+            .returning(Book)
+        )
+        try:
+            book = (await db.scalars(stmt)).first()
+        except ProgrammingError as e:
+            if getattr(e.orig, "sqlstate", None) != _NO_CONFLICT_TARGET:
+                raise
+            await db.rollback()
+            year = data.published_at.year if data.published_at else None
+            duplicates = select(func.count()).where(
+                Book.title == data.title,
+                Book.author_id == data.author_id,
+                func.extract("year", Book.published_at).is_not_distinct_from(year),
+            )
+            if await db.scalar(duplicates):
+                return None
+            return await BookRepository.create(db, data)
+        await db.commit()
         return book
 
+    @staticmethod
+    # Create many books at once
+    async def bulk_create(db: AsyncSession, rows: list[BookCreate]) -> list[Book]:
+        """
+        One batched INSERT ... RETURNING (insertmanyvalues) for all rows.
+        No duplicate check; callers loading data must supply unique books.
+        """
+        if not rows:
+            return []
+        stmt = insert(Book).returning(Book, sort_by_parameter_order=True)
+        books = list((await db.scalars(stmt, [row.model_dump() for row in rows])).all())
+        await db.commit()
+        return books
+
     @staticmethod
     # List books
-    def list(
-        db: Session,
+    async def list(
+        db: AsyncSession,
         author_id: uuid.UUID | None = None,
         q: str | None = None,
         sort: str = "title",
         limit: int = 20,
         offset: int = 0,
+        after: tuple[object, uuid.UUID] | None = None,
     ) -> list[Book]:
-        limit, offset = clamp_pagination(limit, offset)
-
-        stmt = select(Book)
-
-        # filters
-        if author_id:
-            stmt = stmt.where(Book.author_id == author_id)
-        if q:
-            stmt = stmt.where(Book.title.ilike(f"%{q.strip()}%"))
-
-        # sorting
-        if sort in ("title", "published_at"):
-            sort_column = cast(ColumnElement[object], getattr(Book, sort))
-            stmt = stmt.order_by(sort_column)
-
-        # pagination
-        stmt = stmt.limit(limit).offset(offset)
+        """
+        `after` = (sort value, id) of the last row already seen switches from
+        OFFSET to keyset paging, whose cost does not grow with page depth.
+        """
+        stmt, params = _list_books_query(author_id, q, sort, limit, offset, after)
 
         # execute & return
-        return list(db.scalars(stmt).all())
+        return list((await db.scalars(stmt, params)).all())
+
+    @staticmethod
+    # List books as plain rows
+    async def list_rows(
+        db: AsyncSession,
+        author_id: uuid.UUID | None = None,
+        q: str | None = None,
+        sort: str = "title",
+        limit: int = 20,
+        offset: int = 0,
+        after: tuple[object, uuid.UUID] | None = None,
+    ) -> Sequence[RowMapping]:
+        """
+        Same page as list(), as column mappings for direct serialization:
+        no ORM instances, instrumentation or identity-map entries.
+        """
+        stmt, params = _list_books_query(author_id, q, sort, limit, offset, after, rows=True)
+        return (await db.execute(stmt, params)).mappings().all()
 
     @staticmethod
     # Get a book by ID
-    def get(db: Session, book_id: uuid.UUID) -> Book | None:
-        stmt = select(Book).where(Book.id == book_id)
-        return db.scalars(stmt).first()
+    async def get(db: AsyncSession, book_id: uuid.UUID) -> Book | None:
+        return (await db.scalars(_GET_BOOK_STMT, {"book_id": book_id})).first()
 
     @staticmethod
     # Get a book by ID for update
-    def get_for_update(db: Session, book_id: uuid.UUID) -> Book | None:
+    async def get_for_update(db: AsyncSession, book_id: uuid.UUID) -> Book | None:
         stmt = select(Book).where(Book.id == book_id).with_for_update()
-        return db.scalars(stmt).first()
+        return (await db.scalars(stmt)).first()
 
     @staticmethod
     # Update the stock of a book
-    def update_stock(db: Session, book_id: uuid.UUID, new_stock: int) -> None:
+    async def update_stock(db: AsyncSession, book_id: uuid.UUID, new_stock: int) -> None:
         stmt = update(Book).where(Book.id == book_id).values(stock=new_stock)
-        _ = db.execute(stmt)
-
-    @staticmethod
-    # Check if a book exists
-    def book_exists(db: Session, title: str, author_id: uuid.UUID, year: int) -> bool:
-        from datetime import date
-        stmt = (
-            select(Book)
-            .where(Book.title == title)
-            .where(Book.author_id == author_id)
-            .where(Book.published_at.between(date(year, 1, 1), date(year, 12, 31)))
-        )
-        return db.scalars(stmt).first() is not None
+        _ = await db.execute(stmt)
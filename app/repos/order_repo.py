@@ -1,9 +1,8 @@
 import uuid
-from typing import TypeAlias, cast
-from sqlalchemy.engine import Row, CursorResult
-from sqlalchemy import select, update
-from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy.orm import Session
+from typing import TypeAlias
+from sqlalchemy import Integer, column, select, update, values
+from sqlalchemy.dialects.postgresql import UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.book import Book
 from app.models.order import IdempotencyKey, Order, OrderItem
@@ -17,88 +16,97 @@ class OrderRepository:
 
     @staticmethod
     #Create draft order
-    def create_draft(db: Session, data: OrderCreate) -> Order:
-        order = Order(status="DRAFT")
+    async def create_draft(db: AsyncSession, data: OrderCreate) -> Order:
+        """
+        One flush: INSERT ... RETURNING created_at for the order, then a single
+        batched INSERT for all items (ids are client-side, so no refresh needed).
+        """
+        order = Order(
+            id=uuid.uuid4(),
+            status="DRAFT",
+            items=[OrderItem(product_id=it.product_id, qty=it.qty) for it in data.items],
+        )
         db.add(order)
-        db.flush()  # ensure order.id
-
-        for it in data.items:
-            db.add(OrderItem(order_id=order.id, product_id=it.product_id, qty=it.qty))
-
-        db.commit()
-        db.refresh(order)
+        await db.commit()
         return order
 
     @staticmethod
     # Get order by id
-    def get(db: Session, order_id: uuid.UUID) -> Order | None:
-        return db.get(Order, order_id)
+    async def get(db: AsyncSession, order_id: uuid.UUID) -> Order | None:
+        return await db.get(Order, order_id)
 
     @staticmethod
     # Get order items by order id
-    def list_items(db: Session, order_id: uuid.UUID) -> list[OrderItem]:
+    async def list_items(db: AsyncSession, order_id: uuid.UUID) -> list[OrderItem]:
         stmt = select(OrderItem).where(OrderItem.order_id == order_id)
-        return list(db.scalars(stmt).all())
+        return list((await db.scalars(stmt)).all())
 
     @staticmethod
-    # Set order status by order id
-    def set_status(db: Session, order_id: uuid.UUID, new_status: str) -> None:
-        """Pure UPDATE (service decides when to commit)."""
-        stmt = update(Order).where(Order.id == order_id).values(status=new_status)
-        _ = db.execute(stmt)
+    # Mark a draft order confirmed
+    async def claim_draft(db: AsyncSession, order_id: uuid.UUID) -> bool:
+        """
+        Guarded UPDATE ... WHERE status = 'DRAFT'; False when the order is no
+        longer a draft. A concurrent claim blocks on the row lock until the
+        first commits or rolls back, so only one caller proceeds.
+        """
+        stmt = (
+            update(Order)
+            .where(Order.id == order_id, Order.status == "DRAFT")
+            .values(status="CONFIRMED")
+            .returning(Order.id)
+        )
+        return (await db.execute(stmt)).first() is not None
 
     @staticmethod
-    # Try decrement book stock by book id
-    def try_decrement_book_optimistic(
-        db: Session, book_id: uuid.UUID, qty: int
-    ) -> tuple[bool, int]:
-
-        row: Row[tuple[int, int]] | None = db.execute(
-                    select(Book.version, Book.stock).where(Book.id == book_id)
-        ).one_or_none()
-
-        if row is None:
-            return (False, 0)
-
-        typed_row: tuple[int, int] = cast(
-                tuple[int, int],
-                cast(object, row)
-            )
-
-        version: int = typed_row[0]
-        stock: int = typed_row[1]
+    # Read current stock of books
+    async def get_books_stock(db: AsyncSession, book_ids: list[uuid.UUID]) -> dict[uuid.UUID, int]:
+        stmt = select(Book.id, Book.stock).where(Book.id.in_(book_ids))
+        rows = (await db.execute(stmt)).tuples().all()
+        return {book_id: stock for book_id, stock in rows}
 
-        if stock < qty:
-            return (False, stock)
-
-        upd = (
+    @staticmethod
+    # Decrement stock of every book that can cover its quantity
+    async def decrement_books_stock(
+        db: AsyncSession, qty_by_book: dict[uuid.UUID, int]
+    ) -> set[uuid.UUID]:
+        """
+        SELECT ... ORDER BY id FOR UPDATE locks the rows in id order (the UPDATE
+        alone gives no lock-order guarantee, so concurrent confirms could
+        deadlock), then one UPDATE ... FROM (VALUES ...) with the stock check
+        fused into the WHERE clause; returns the ids that were decremented.
+        Rows not returned were short, and the caller must roll back.
+        """
+        if not qty_by_book:
+            return set()
+        lock = (
+            select(Book.id)
+            .where(Book.id.in_(list(qty_by_book)))
+            .order_by(Book.id)
+            .with_for_update()
+        )
+        _ = await db.execute(lock)
+        wanted = values(
+            column("id", UUID(as_uuid=True)), column("qty", Integer), name="wanted"
+        ).data(list(qty_by_book.items()))
+        stmt = (
             update(Book)
-            .where(
-                Book.id == book_id,
-                Book.version == version,
-                Book.stock >= qty,
-            )
-            .values(
-                stock=Book.stock - qty,
-                version=Book.version + 1,
-            )
+            .where(Book.id == wanted.c.id, Book.stock >= wanted.c.qty)
+            .values(stock=Book.stock - wanted.c.qty, version=Book.version + 1)
+            .returning(Book.id)
         )
-        result = db.execute(upd)
-        typed_result = cast(CursorResult[object], result)
-        ok = typed_result.rowcount == 1
-        return (ok, stock)
+        return set((await db.execute(stmt)).scalars().all())
 
     # ---- Idempotency ----
     @staticmethod
-    def get_idempotency(db: Session, key: str) -> IdempotencyKey | None:
+    async def get_idempotency(db: AsyncSession, key: str) -> IdempotencyKey | None:
         stmt = select(IdempotencyKey).where(IdempotencyKey.id == key)
-        return db.execute(stmt).scalar_one_or_none()
+        return (await db.execute(stmt)).scalar_one_or_none()
 
     @staticmethod
-    # Save idempotency key
-    def save_idempotency(
-        db: Session, key: str, order_id: uuid.UUID, response: JSONDict
-    ) -> None:
+    # Save idempotency key; False when the key was already stored
+    async def save_idempotency(
+        db: AsyncSession, key: str, order_id: uuid.UUID, response: JSONDict
+    ) -> bool:
         stmt = (
                 insert(IdempotencyKey)
                 .values(
@@ -107,5 +115,6 @@ class OrderRepository:
                     response=response,
                 )
                 .on_conflict_do_nothing(index_elements=["id"])
+                .returning(IdempotencyKey.id)
             )
-        _ = db.execute(stmt)
+        return (await db.execute(stmt)).first() is not None
@@ -24,4 +24,4 @@ class AuthorCreate(AuthorBase):
 class AuthorRead(AuthorBase):
     id: uuid.UUID
 
-    model_config: ClassVar[ConfigDict] = ConfigDict(from_attributes=True)
+    model_config: ClassVar[ConfigDict] = ConfigDict(from_attributes=True, frozen=True)
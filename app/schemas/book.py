@@ -43,4 +43,4 @@ class BookRead(BookBase):
     id: uuid.UUID
     version: int
 
-    model_config: ClassVar[ConfigDict] = ConfigDict(from_attributes=True)
+    model_config: ClassVar[ConfigDict] = ConfigDict(from_attributes=True, frozen=True)
@@ -25,6 +25,8 @@ class OrderItemRead(BaseModel):
     product_id: uuid.UUID
     qty: int
 
+    model_config: ClassVar[ConfigDict] = ConfigDict(frozen=True)
+
 # Order read
 class OrderRead(BaseModel):
     id: uuid.UUID
@@ -32,4 +34,10 @@ class OrderRead(BaseModel):
     created_at: datetime
     items: list[OrderItemRead] = []
 
-    model_config: ClassVar[ConfigDict] = ConfigDict(from_attributes=True)
+    model_config: ClassVar[ConfigDict] = ConfigDict(from_attributes=True, frozen=True)
+
+# Order confirmation result
+class OrderConfirmRead(BaseModel):
+    id: uuid.UUID
+    status: str
+    created_at: str
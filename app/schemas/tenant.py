@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+# Tenant bootstrap result
+class TenantBootstrapRead(BaseModel):
+    status: str
+    tenant: str
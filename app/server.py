@@ -0,0 +1,24 @@
+"""
+Production entrypoint: `python -m app.server`.
+"""
+import uvicorn
+from app.core.config import settings
+
+
+def main() -> None:
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=settings.WEB_CONCURRENCY,
+        # Keep the handlers installed by setup_logging; skip per-request access lines
+        log_config=None,
+        access_log=False,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.author import AuthorCreate
 from app.repos.author_repo import AuthorRepository
 
@@ -6,11 +6,11 @@ from app.repos.author_repo import AuthorRepository
 class AuthorService:
     @staticmethod
     # Create author
-    def create_author(db: Session, data: AuthorCreate):
+    async def create_author(db: AsyncSession, data: AuthorCreate):
         # Future: check for duplicates if needed
-        return AuthorRepository.create(db, data)
+        return await AuthorRepository.create(db, data)
 
     @staticmethod
     # List authors
-    def list_authors(db: Session):
-        return AuthorRepository.list(db)
+    async def list_authors(db: AsyncSession):
+        return await AuthorRepository.list(db)
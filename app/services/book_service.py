@@ -1,6 +1,9 @@
 from __future__ import annotations
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from collections.abc import Sequence
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+from starlette.status import HTTP_404_NOT_FOUND
 import uuid
 from app.schemas.book import BookCreate
 from app.repos.book_repo import BookRepository
@@ -10,35 +13,63 @@ from app.models.book import Book
 class BookService:
     @staticmethod
     # Create book
-    def create_book(db: Session, data: BookCreate) -> Book:
-        year = data.published_at.year if data.published_at else None
-
-        query = select(func.count()).where(
-            Book.title == data.title,
-            Book.author_id == data.author_id,
-            func.extract("year", Book.published_at) == year,
-        )
-
-        if db.scalar(query):
+    async def create_book(db: AsyncSession, data: BookCreate) -> Book:
+        book = await BookRepository.create_if_absent(db, data)
+        if book is None:
             raise ValueError("Duplicate book (title + author + year)")
+        return book
+
+    @staticmethod
+    # Create many books in one insert
+    async def create_books(db: AsyncSession, rows: list[BookCreate]) -> list[Book]:
+        return await BookRepository.bulk_create(db, rows)
 
-        return BookRepository.create(db, data)
+    @staticmethod
+    # Get book
+    async def get_book(db: AsyncSession, book_id: uuid.UUID) -> Book:
+        book = await BookRepository.get(db, book_id)
+        if book is None:
+            raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="book not found")
+        return book
 
     @staticmethod
     # List books
-    def list_books(
-        db: Session,
+    async def list_books(
+        db: AsyncSession,
         author_id: uuid.UUID | None = None,
         q: str | None = None,
         sort: str = "title",
         limit: int = 20,
         offset: int = 0,
+        after: tuple[object, uuid.UUID] | None = None,
     ) -> list[Book]:
-        return BookRepository.list(
+        return await BookRepository.list(
+            db,
+            author_id=author_id,
+            q=q,
+            sort=sort,
+            limit=limit,
+            offset=offset,
+            after=after,
+        )
+
+    @staticmethod
+    # List books as plain rows for serialization
+    async def list_book_rows(
+        db: AsyncSession,
+        author_id: uuid.UUID | None = None,
+        q: str | None = None,
+        sort: str = "title",
+        limit: int = 20,
+        offset: int = 0,
+        after: tuple[object, uuid.UUID] | None = None,
+    ) -> Sequence[RowMapping]:
+        return await BookRepository.list_rows(
             db,
             author_id=author_id,
             q=q,
             sort=sort,
             limit=limit,
             offset=offset,
+            after=after,
         )
@@ -1,10 +1,13 @@
 from collections.abc import Mapping
 from typing import cast
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
-from app.schemas.order import OrderCreate, OrderItemRead, OrderRead
+from app.models.order import Order
+from app.schemas.order import OrderCreate
 from app.repos.order_repo import OrderRepository
+from app.core.cache import invalidate
+from app.utils import idem_cache
 import uuid
 
 from starlette.status import (
@@ -19,36 +22,48 @@ JSONValue = str | int | bool | float | None | dict[str, "JSONValue"] | list["JSO
 
 class OrderService:
     @staticmethod
-    def create_order(db: Session, data: OrderCreate) -> OrderRead:
+    async def create_order(db: AsyncSession, data: OrderCreate) -> Order:
         try:
-            order = OrderRepository.create_draft(db, data)
-            items = [
-                OrderItemRead(product_id=it.product_id, qty=it.qty)
-                for it in OrderRepository.list_items(db, order.id)
-            ]
-            return OrderRead(
-                id=order.id, status=order.status, created_at=order.created_at, items=items
-            )
+            # The route's response_model validates the ORM object once on the way out
+            return await OrderRepository.create_draft(db, data)
         except IntegrityError as e:
-            db.rollback()
+            await db.rollback()
             # Let the global error handler convert this to a proper 400 response
             raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Referenced resource not found") from e
 
     @staticmethod
-    def confirm_order(
-        db: Session, order_id: uuid.UUID, idempotency_key: str | None
+    async def confirm_order(
+        db: AsyncSession, order_id: uuid.UUID, idempotency_key: str | None
     ) ->  Mapping[str, str | int | bool]:
+        # Stored responses are cached per process once read back from the DB
+        # or once this call's own row commits (a concurrent winner's row may
+        # differ); tenant-bound sessions only
+        tenant: str | None = db.info.get("tenant")
+
         # Idempotency: if key exists, return stored response immediately
         if idempotency_key:
-               cached = OrderRepository.get_idempotency(db, idempotency_key)
+               if tenant is not None:
+                   hit = idem_cache.get(tenant, idempotency_key)
+                   if hit is not None:
+                       return hit
+               cached = await OrderRepository.get_idempotency(db, idempotency_key)
                if cached:
-                   return cast(Mapping[str, str | int | bool], cached.response)
+                   stored = cast(Mapping[str, str | int | bool], cached.response)
+                   if tenant is not None:
+                       idem_cache.put(tenant, idempotency_key, stored)
+                   return stored
 
-        order = OrderRepository.get(db, order_id)
+        order = await OrderRepository.get(db, order_id)
         if not order:
             raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="order not found")
 
-        if order.status != "DRAFT":
+        claimed = order.status == "DRAFT" and await OrderRepository.claim_draft(db, order.id)
+        if not claimed:
+            if order.status == "DRAFT":
+                # A concurrent confirm took the order first; answer with its outcome
+                await db.rollback()
+                await db.refresh(order)
+
             # Already confirmed/cancelled → treat as idempotent success for CONFIRMED
             response: dict[str, str | int | bool] = {
                 "id": str(order.id),
@@ -57,67 +72,70 @@ class OrderService:
             }
 
             if idempotency_key:
-                    OrderRepository.save_idempotency(
+                    saved = await OrderRepository.save_idempotency(
                         db,
                         idempotency_key,
                         order.id,
                         cast(dict[str, JSONValue], dict(response)),
                     )
-                    db.commit()
+                    await db.commit()
+                    if saved and tenant is not None:
+                        idem_cache.put(tenant, idempotency_key, response)
 
             return response
 
-        # Try to decrement stock for each item using optimistic locking
-        items = OrderRepository.list_items(db, order.id)
-        shortages: list[dict[str, int | str]] = []
+        # Sum quantities per book so repeated products are checked together
+        qty_by_book: dict[uuid.UUID, int] = {}
+        for it in order.items:
+            qty_by_book[it.product_id] = qty_by_book.get(it.product_id, 0) + it.qty
+
+        response = {
+            "id": str(order.id),
+            "status": "CONFIRMED",
+            "created_at": order.created_at.isoformat(),
+        }
 
         # Use a transaction boundary
         try:
-            for it in items:
-                ok, available = OrderRepository.try_decrement_book_optimistic(
-                    db, it.product_id, it.qty
-                )
-                if not ok:
-                    shortages.append(
-                        {
-                            "product_id": str(it.product_id),
-                            "requested": it.qty,
-                            "available": available,
-                        }
-                    )
-
-            if shortages:
-                db.rollback()
+            decremented = await OrderRepository.decrement_books_stock(db, qty_by_book)
+            if len(decremented) < len(qty_by_book):
+                short_ids = [pid for pid in qty_by_book if pid not in decremented]
+                stock_by_book = await OrderRepository.get_books_stock(db, short_ids)
+                shortages: list[dict[str, int | str]] = [
+                    {
+                        "product_id": str(pid),
+                        "requested": qty_by_book[pid],
+                        "available": stock_by_book.get(pid, 0),
+                    }
+                    for pid in short_ids
+                ]
+                await db.rollback()
                 raise HTTPException(status_code=HTTP_409_CONFLICT, detail={"shortages": shortages})
 
-            OrderRepository.set_status(db, order.id, "CONFIRMED")
-            db.commit()
+            # Idempotency record commits together with the claimed status
+            saved = False
+            if idempotency_key:
+                saved = await OrderRepository.save_idempotency(
+                    db,
+                    idempotency_key,
+                    order.id,
+                    cast(dict[str, JSONValue], dict(response)),
+                )
+            await db.commit()
 
         except HTTPException:
             # rethrow 409, etc.
             raise
         except IntegrityError as e:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Data integrity violation") from e
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(status_code=HTTP_500_INTERNAL_SERVER_ERROR, detail="confirm failed") from e
 
-        # Build response
-        response = {
-            "id": str(order.id),
-            "status": "CONFIRMED",
-            "created_at": order.created_at.isoformat(),
-        }
-
-        # Save idempotency record if provided (after success)
-        if idempotency_key:
-            OrderRepository.save_idempotency(
-                db,
-                idempotency_key,
-                order.id,
-                cast(dict[str, JSONValue], dict(response)),
-            )
-            db.commit()
-
+        if tenant is not None:
+            # Stock changed, which cached book lists include
+            await invalidate(tenant, "books")
+            if saved and idempotency_key:
+                idem_cache.put(tenant, idempotency_key, response)
         return response
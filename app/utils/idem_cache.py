@@ -0,0 +1,38 @@
+"""
+Per-process TTL LRU of confirmed-order responses keyed by
+(tenant, idempotency key). The idempotency_keys table stays authoritative;
+stored responses never change, so entries are never invalidated.
+"""
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+
+_MAX_ENTRIES = 10_000
+_TTL_SECONDS = 300.0
+
+Response = Mapping[str, str | int | bool]
+
+_entries: OrderedDict[tuple[str, str], tuple[float, Response]] = OrderedDict()
+
+
+def get(tenant: str, key: str) -> Response | None:
+    entry = _entries.get((tenant, key))
+    if entry is None:
+        return None
+    expires_at, response = entry
+    if expires_at < time.monotonic():
+        del _entries[(tenant, key)]
+        return None
+    _entries.move_to_end((tenant, key))
+    return response
+
+
+def put(tenant: str, key: str, response: Response) -> None:
+    _entries[(tenant, key)] = (time.monotonic() + _TTL_SECONDS, response)
+    _entries.move_to_end((tenant, key))
+    while len(_entries) > _MAX_ENTRIES:
+        _ = _entries.popitem(last=False)
+
+
+def clear() -> None:
+    _entries.clear()
@@ -1,4 +1,33 @@
+import base64
+import binascii
+import json
+import uuid
+
+
 def clamp_pagination(limit: int, offset: int, max_limit: int = 100):
-    limit = max(1, min(limit, max_limit))
-    offset = max(0, offset)
+    # Routes already validate these; plain comparisons keep the common
+    # in-range case free of min()/max() calls
+    if limit > max_limit:
+        limit = max_limit
+    elif limit < 1:
+        limit = 1
+    if offset < 0:
+        offset = 0
     return limit, offset
+
+
+def encode_cursor(sort: str, value: str | None, last_id: uuid.UUID) -> str:
+    """Opaque keyset cursor: the sort field, its value and the id of the last row."""
+    raw = json.dumps([sort, value, str(last_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[str, str | None, uuid.UUID]:
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor."""
+    try:
+        sort, value, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(sort, str) or not (value is None or isinstance(value, str)):
+        raise ValueError("Invalid cursor")
+    return sort, value, uuid.UUID(str(last_id))
@@ -1,53 +1,120 @@
+import hashlib
+import os
 import pytest
+import pytest_asyncio
 import uuid
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
-from fastapi.testclient import TestClient
+from collections.abc import Iterator
+from contextlib import contextmanager
+from types import SimpleNamespace
+from sqlalchemy import Connection, create_engine, event, insert, make_url, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker, create_async_engine
+from fastapi import Request
+from httpx import ASGITransport, AsyncClient
 
 from app.main import app
-from app.db.session import engine
+from app.db.session import engine as app_engine, get_db_with_tenant
+from app.core.middleware_tenant import register_tenant
 from app.models.base import Base
 from app.core.config import settings
 
-# Test database URL
-BASE_URL = settings.DATABASE_URL
-TEST_DATABASE_URL = BASE_URL.rsplit("/", 1)[0] + "/test_books_orders_db"
-
-# Create test engine
-test_engine = create_engine(TEST_DATABASE_URL, pool_pre_ping=True, future=True, echo=False)
-TestSessionLocal = sessionmaker(bind=test_engine, autocommit=False, autoflush=False, future=True)
+# Test database URL; one database per pytest-xdist worker (gw0, gw1, ...)
+BASE_URL = make_url(settings.DATABASE_URL)
+_WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+TEST_DATABASE_URL = BASE_URL.set(
+    database=f"test_books_orders_db_{_WORKER}" if _WORKER else "test_books_orders_db"
+)
+
+# Sync engines (psycopg) for schema setup/teardown outside the event loop
+engine = create_engine(BASE_URL.set(drivername="postgresql+psycopg"), pool_pre_ping=True)
+test_engine = create_engine(
+    TEST_DATABASE_URL.set(drivername="postgresql+psycopg"), pool_pre_ping=True, echo=False
+)
+
+# Async engine for repository/service tests. The test database is throwaway,
+# so commits skip waiting for the WAL flush.
+test_async_engine = create_async_engine(
+    TEST_DATABASE_URL,
+    pool_pre_ping=True,
+    echo=False,
+    connect_args={"server_settings": {"synchronous_commit": "off"}},
+)
+TestSessionLocal = async_sessionmaker(test_async_engine, autoflush=False, expire_on_commit=False)
+
+
+# Extensions used by the models' DDL
+EXTENSIONS_SQL = (
+    "CREATE EXTENSION IF NOT EXISTS citext",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+)
+
+# Database the per-worker test databases are cloned from, named after a hash
+# of its setup so a changed setup builds a new template instead of reusing
+TEMPLATE_PREFIX = "test_books_orders_template"
+TEMPLATE_DATABASE = (
+    f"{TEMPLATE_PREFIX}_{hashlib.sha256(';'.join(EXTENSIONS_SQL).encode()).hexdigest()[:12]}"
+)
+
+
+def _build_template(conn: Connection) -> None:
+    """Create the template with the extensions the models need, unless it exists."""
+    if conn.scalar(text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": TEMPLATE_DATABASE}):
+        return
+    # Templates of earlier setups are never cloned again
+    stale = conn.scalars(
+        text("SELECT datname FROM pg_database WHERE datname LIKE :prefix"),
+        {"prefix": f"{TEMPLATE_PREFIX}%"},
+    ).all()
+    for name in stale:
+        _ = conn.execute(text(f'DROP DATABASE IF EXISTS "{name}"'))
+    # Built under a temporary name so an interrupted build is never cloned
+    building = f"{TEMPLATE_DATABASE}_build"
+    _ = conn.execute(text(f'CREATE DATABASE "{building}"'))
+    build_engine = create_engine(BASE_URL.set(drivername="postgresql+psycopg", database=building))
+    with build_engine.begin() as build_conn:
+        for statement in EXTENSIONS_SQL:
+            _ = build_conn.execute(text(statement))
+    build_engine.dispose()
+    _ = conn.execute(text(f'ALTER DATABASE "{building}" RENAME TO "{TEMPLATE_DATABASE}"'))
 
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_database():
     """Setup test database and clean up after tests."""
-    with engine.connect() as conn:
-        _ = conn.execute(text("COMMIT"))
+    # Clone the test database from a template instead of installing the
+    # extensions per session; the advisory lock lets one xdist worker build
+    # it while the others wait. CREATE DATABASE cannot run inside a
+    # transaction block. Tables live in per-test tenant schemas, so the
+    # public schema stays empty.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        _ = conn.execute(text("SELECT pg_advisory_lock(hashtext(:name))"), {"name": TEMPLATE_PREFIX})
         try:
-            _ = conn.execute(text("CREATE DATABASE test_books_orders_db"))
-        except Exception:
-            pass
-
-    # Create extensions and tables in test database
-    with test_engine.connect() as conn:
-        _ = conn.execute(text("CREATE EXTENSION IF NOT EXISTS citext"))
-        Base.metadata.create_all(bind=conn)
+            _build_template(conn)
+            # Left over from an earlier run
+            _ = conn.execute(text(f'DROP DATABASE IF EXISTS "{TEST_DATABASE_URL.database}"'))
+            _ = conn.execute(
+                text(f'CREATE DATABASE "{TEST_DATABASE_URL.database}" TEMPLATE "{TEMPLATE_DATABASE}"')
+            )
+        finally:
+            _ = conn.execute(text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": TEMPLATE_PREFIX})
+
+    # The same extensions in the app database
+    with engine.connect() as conn:
+        for statement in EXTENSIONS_SQL:
+            _ = conn.execute(text(statement))
+        conn.commit()
 
     yield
 
-    # Clean up: drop all tables
-    Base.metadata.drop_all(bind=test_engine)
-
     # Clean up test database - handle transaction properly by using autocommit
     with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
         try:
-            _ = conn.execute(text("DROP DATABASE IF EXISTS test_books_orders_db"))
+            _ = conn.execute(text(f'DROP DATABASE IF EXISTS "{TEST_DATABASE_URL.database}"'))
         except Exception:
             pass  # Database might not exist or have connections
 
 
-@pytest.fixture
-def db_session():
+@pytest_asyncio.fixture
+async def db_session():
     """Create a fresh database session for each test."""
     session = TestSessionLocal()
     try:
@@ -55,30 +122,268 @@ def db_session():
     finally:
         # Ensure all connections are properly closed and transactions cleaned up
         try:
-            session.rollback()  # Rollback any pending transactions
+            await session.rollback()  # Rollback any pending transactions
         except:
             pass  # Ignore rollback errors
-        session.close()  # Close the session
-        # Additional cleanup to prevent hanging
-        session.expunge_all()  # Remove all objects from session
+        await session.close()  # Close the session
+        # Close pooled connections so schema and database teardown never wait on them
+        await test_async_engine.dispose()
 
 
 @pytest.fixture
-def test_client():
-    """Create a test client for FastAPI app."""
-    return TestClient(app)
+def count_queries():
+    """
+    Collect SQL run on the async test engine, to pin query counts:
+        with count_queries() as queries: ...
+        assert len(queries) <= 4
+    """
+    @contextmanager
+    def _count() -> Iterator[list[str]]:
+        queries: list[str] = []
+
+        def before_cursor_execute(_conn, _cursor, statement, _params, _context, _executemany):
+            queries.append(statement)
+
+        event.listen(test_async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield queries
+        finally:
+            event.remove(test_async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    return _count
+
+
+def _rolls_back(request: pytest.FixtureRequest) -> bool:
+    """Whether the test is marked `transactional`."""
+    return request.node.get_closest_marker("transactional") is not None
+
+
+def _sessions_on(conn: AsyncConnection):
+    """get_db_with_tenant override joining the test's open transaction."""
+    async def get_db(request: Request):
+        # Session commits/rollbacks become SAVEPOINT release/rollback
+        async with AsyncSession(
+            bind=conn,
+            join_transaction_mode="create_savepoint",
+            autoflush=False,
+            expire_on_commit=False,
+        ) as db:
+            tenant = getattr(request.state, "tenant", None)
+            if tenant is not None:
+                db.info["tenant"] = tenant
+            yield db
+
+    return get_db
+
+
+@pytest_asyncio.fixture
+async def tx_connection(request):
+    """
+    Test-database connection inside a transaction that is rolled back after
+    a `transactional` test; None for other tests.
+    """
+    if not _rolls_back(request):
+        yield None
+        return
+
+    async with test_async_engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            yield conn
+        finally:
+            await transaction.rollback()
+    # Close pooled connections so schema and database teardown never wait on them
+    await test_async_engine.dispose()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def http_client():
+    """One in-process AsyncClient shared by the whole session."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    # ASGITransport skips the lifespan, which would close the app's pool
+    await app_engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def client(http_client, tx_connection):
+    """
+    The session's AsyncClient, with dependency overrides reset per test.
+    For `transactional` tests the app's sessions join `tx_connection`.
+    """
+    if tx_connection is not None:
+        app.dependency_overrides[get_db_with_tenant] = _sessions_on(tx_connection)
+    try:
+        yield http_client
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def seed(tx_connection, bootstrap_tenant):
+    """
+    Bulk-insert setup rows into the tenant within the `transactional` test's
+    transaction, skipping the HTTP layer:
+        await seed(Book, [{...}, ...])
+    """
+    async def _seed(model: type[Base], rows: list[dict[str, object]]) -> None:
+        _ = await tx_connection.execute(text(f'SET LOCAL search_path TO "{bootstrap_tenant}", public'))
+        _ = await tx_connection.execute(insert(model), rows)
+
+    return _seed
+
+
+@pytest_asyncio.fixture
+async def many_books(seed, sample_author):
+    """30 books by sample_author titled "Book 00".."Book 29", in one insert."""
+    from app.models.book import Book
+
+    # Inserted in reverse so title order never matches insertion order
+    await seed(Book, [
+        {"title": f"Book {i:02d}", "author_id": sample_author["id"], "price": 10.99 + i, "stock": i + 1}
+        for i in reversed(range(30))
+    ])
+
+
+@pytest.fixture(scope="session")
+def two_tenants(setup_test_database):
+    """Two tenant schemas created once in the test database for `transactional` tests."""
+    suffix = uuid.uuid4().hex[:8]
+    tenants = (f"test_tenant_{suffix}", f"other_tenant_{suffix}")
+    with test_engine.begin() as conn:
+        for tenant in tenants:
+            _ = conn.execute(text(f'CREATE SCHEMA "{tenant}"'))
+            _ = conn.execute(text(f'SET LOCAL search_path TO "{tenant}", public'))
+            Base.metadata.create_all(bind=conn)
+            # Known to the tenant middleware, which otherwise looks in the app database
+            register_tenant(tenant)
+
+    yield tenants
+
+    with test_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for tenant in tenants:
+            _ = conn.execute(text(f'DROP SCHEMA IF EXISTS "{tenant}" CASCADE'))
+
+
+@pytest.fixture(scope="session")
+def shared_tenant(two_tenants):
+    """Tenant the `transactional` tests run as."""
+    return two_tenants[0]
+
+
+@pytest.fixture(scope="session")
+def other_tenant(two_tenants):
+    """Second tenant, for isolation checks."""
+    return two_tenants[1]
+
+
+@pytest.fixture(scope="session")
+def worker_tenant():
+    """
+    Per-worker name for tests that bootstrap a fixed tenant name, so xdist
+    workers sharing the app database never bootstrap the same schema at once:
+        worker_tenant("twice_test_tenant")
+    """
+    def _name(name: str) -> str:
+        return f"{name}_{_WORKER}" if _WORKER else name
+    return _name
+
+
+@pytest_asyncio.fixture(scope="session")
+async def api_tenants(http_client):
+    """
+    Two tenants bootstrapped through the API once per session, for tests
+    that only read from them (or, for the second, expect it empty).
+    """
+    suffix = uuid.uuid4().hex[:8]
+    tenants = (f"api_tenant_{suffix}", f"api_other_tenant_{suffix}")
+    for tenant in tenants:
+        response = await http_client.post(f"/api/v1/tenants/{tenant}/bootstrap")
+        assert response.status_code == 200, f"Failed to bootstrap tenant: {response.text}"
+
+    yield tenants
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for tenant in tenants:
+            _ = conn.execute(text(f'DROP SCHEMA IF EXISTS "{tenant}" CASCADE'))
+
+
+@pytest.fixture(scope="session")
+def api_tenant(api_tenants):
+    return api_tenants[0]
+
+
+@pytest.fixture(scope="session")
+def api_other_tenant(api_tenants):
+    return api_tenants[1]
+
+
+@pytest_asyncio.fixture(scope="class")
+async def bootstrapped_tenant(http_client):
+    """
+    Tenant bootstrapped through the API once per test class, as
+    SimpleNamespace(tenant, headers). Its tests share the data, so each
+    creates its own author and filters listings by it.
+    """
+    tenant = f"test_tenant_{uuid.uuid4().hex[:8]}"
+    response = await http_client.post(f"/api/v1/tenants/{tenant}/bootstrap")
+    assert response.status_code == 200, f"Failed to bootstrap tenant: {response.text}"
+
+    yield SimpleNamespace(tenant=tenant, headers={"X-Tenant": tenant})
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        _ = conn.execute(text(f'DROP SCHEMA IF EXISTS "{tenant}" CASCADE'))
+
+
+@pytest_asyncio.fixture(scope="class")
+async def tenant_pair(http_client):
+    """
+    Two tenants bootstrapped through the API once per test class, each with
+    one author and one book: [SimpleNamespace(tenant, headers, author, book)].
+    """
+    suffix = uuid.uuid4().hex[:12]
+    pair = []
+    for n, (price, stock) in enumerate([(29.99, 10), (39.99, 5)], start=1):
+        tenant = f"tenant{n}_{suffix}"
+        headers = {"X-Tenant": tenant}
+        response = await http_client.post(f"/api/v1/tenants/{tenant}/bootstrap")
+        assert response.status_code == 200, f"Failed to bootstrap tenant: {response.text}"
+        author = (await http_client.post(
+            "/api/v1/authors",
+            json={"name": f"Tenant{n} Author {suffix}", "email": f"author{n}{suffix}@tenant{n}.com"},
+            headers=headers,
+        )).json()
+        book = (await http_client.post(
+            "/api/v1/books",
+            json={"title": f"Tenant{n} Book", "author_id": author["id"], "price": price, "stock": stock},
+            headers=headers,
+        )).json()
+        pair.append(SimpleNamespace(tenant=tenant, headers=headers, author=author, book=book))
+
+    yield pair
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for side in pair:
+            _ = conn.execute(text(f'DROP SCHEMA IF EXISTS "{side.tenant}" CASCADE'))
 
 
 @pytest.fixture
-def test_tenant():
+def test_tenant(request):
     """Test tenant name."""
+    if _rolls_back(request):
+        return request.getfixturevalue("shared_tenant")
     import uuid
     return f"test_tenant_{uuid.uuid4().hex[:8]}"
 
 
 @pytest.fixture
-def bootstrap_tenant(test_tenant):
+def bootstrap_tenant(request, test_tenant):
     """Bootstrap a tenant schema for testing."""
+    if _rolls_back(request):
+        # Already bootstrapped by shared_tenant; writes are rolled back by `client`
+        yield test_tenant
+        return
+
     # For test database, we need to bootstrap using test engine
     from sqlalchemy import text
 
@@ -142,8 +447,8 @@ def bootstrap_tenant(test_tenant):
         pass  # Schema might already be dropped
 
 
-@pytest.fixture
-def sample_author(test_client, bootstrap_tenant, headers_with_tenant):
+@pytest_asyncio.fixture
+async def sample_author(client, bootstrap_tenant, headers_with_tenant):
     """Create a sample author for testing using the API (avoiding session conflicts)."""
     import uuid
     unique_suffix = str(uuid.uuid4())[:8]
@@ -153,7 +458,7 @@ def sample_author(test_client, bootstrap_tenant, headers_with_tenant):
         "email": f"test-{unique_suffix}@author.com"
     }
 
-    response = test_client.post(
+    response = await client.post(
         "/api/v1/authors",
         json=author_data,
         headers=headers_with_tenant
@@ -163,8 +468,8 @@ def sample_author(test_client, bootstrap_tenant, headers_with_tenant):
     return response.json()
 
 
-@pytest.fixture
-def sample_book(test_client, bootstrap_tenant, sample_author, headers_with_tenant):
+@pytest_asyncio.fixture
+async def sample_book(client, bootstrap_tenant, sample_author, headers_with_tenant):
     """Create a sample book for testing using the API (avoiding session conflicts)."""
     import uuid
     unique_suffix = str(uuid.uuid4())[:8]
@@ -177,7 +482,7 @@ def sample_book(test_client, bootstrap_tenant, sample_author, headers_with_tenan
         "published_at": "2023-01-01"
     }
 
-    response = test_client.post(
+    response = await client.post(
         "/api/v1/books",
         json=book_data,
         headers=headers_with_tenant
@@ -187,8 +492,8 @@ def sample_book(test_client, bootstrap_tenant, sample_author, headers_with_tenan
     return response.json()
 
 
-@pytest.fixture
-def sample_order(test_client, bootstrap_tenant, sample_book, headers_with_tenant):
+@pytest_asyncio.fixture
+async def sample_order(client, bootstrap_tenant, sample_book, headers_with_tenant):
     """Create a sample order for testing using the API (avoids DB session conflicts)."""
     order_data = {
         "items": [
@@ -199,7 +504,7 @@ def sample_order(test_client, bootstrap_tenant, sample_book, headers_with_tenant
         ]
     }
 
-    response = test_client.post(
+    response = await client.post(
         "/api/v1/orders",
         json=order_data,
         headers=headers_with_tenant
@@ -210,13 +515,13 @@ def sample_order(test_client, bootstrap_tenant, sample_book, headers_with_tenant
 
 
 # Fixtures for repository tests that need SQLAlchemy model objects
-@pytest.fixture
-def sample_author_model(db_session, bootstrap_tenant):
+@pytest_asyncio.fixture
+async def sample_author_model(db_session, bootstrap_tenant):
     """Create a sample author model for repository tests."""
     from app.models.author import Author
 
     # Set search path for this session (tables should already exist from bootstrap_tenant)
-    _ = db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
+    _ = await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
     import uuid
     unique_suffix = str(uuid.uuid4())[:8]
@@ -226,19 +531,19 @@ def sample_author_model(db_session, bootstrap_tenant):
         email=f"test-{unique_suffix}@author.com"
     )
     db_session.add(author)
-    db_session.commit()
-    db_session.refresh(author)
+    await db_session.commit()
+    await db_session.refresh(author)
     return author
 
 
-@pytest.fixture
-def sample_book_model(db_session, bootstrap_tenant, sample_author_model):
+@pytest_asyncio.fixture
+async def sample_book_model(db_session, bootstrap_tenant, sample_author_model):
     """Create a sample book model for repository tests."""
     from app.models.book import Book
     from datetime import date
 
     # Set search path to test tenant schema (tables should already exist from bootstrap_tenant)
-    _ = db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
+    _ = await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
     import uuid
     unique_suffix = str(uuid.uuid4())[:8]
@@ -252,22 +557,22 @@ def sample_book_model(db_session, bootstrap_tenant, sample_author_model):
         published_at=date(2023, 1, 1)
     )
     db_session.add(book)
-    db_session.commit()
-    db_session.refresh(book)
+    await db_session.commit()
+    await db_session.refresh(book)
     return book
 
 
-@pytest.fixture
-def sample_order_model(db_session, bootstrap_tenant, sample_book_model):
+@pytest_asyncio.fixture
+async def sample_order_model(db_session, bootstrap_tenant, sample_book_model):
     """Create a sample order model for repository tests."""
     from app.models.order import Order, OrderItem
 
     # Set search path to test tenant schema (tables should already exist from bootstrap_tenant)
-    _ = db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
+    _ = await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
     order = Order(status="DRAFT")
     db_session.add(order)
-    db_session.flush()
+    await db_session.flush()
 
     order_item = OrderItem(
         order_id=order.id,
@@ -275,8 +580,8 @@ def sample_order_model(db_session, bootstrap_tenant, sample_book_model):
         qty=2
     )
     db_session.add(order_item)
-    db_session.commit()
-    db_session.refresh(order)
+    await db_session.commit()
+    await db_session.refresh(order)
     return order
 
 
@@ -286,6 +591,12 @@ def headers_with_tenant(test_tenant):
     return {"X-Tenant": test_tenant}
 
 
+@pytest.fixture(scope="session")
+def headers_other_tenant(other_tenant):
+    """HTTP headers for the second `transactional` tenant."""
+    return {"X-Tenant": other_tenant}
+
+
 @pytest.fixture
 def headers_with_correlation():
     """HTTP headers with correlation ID."""
@@ -1,11 +1,20 @@
+import pytest
 from fastapi import status
 import uuid
+from sqlalchemy import text
+
+from app.models.book import Book
+from app.schemas.book import BookCreate, BookRead
+from app.utils.pagination import encode_cursor
+
+# Shared tenant schema; each test's writes are rolled back
+pytestmark = pytest.mark.transactional
 
 
 class TestBookEndpoints:
     """Test book management endpoints."""
 
-    def test_create_book_success(self, test_client, bootstrap_tenant, sample_author, headers_with_tenant):
+    async def test_create_book_success(self, client, bootstrap_tenant, sample_author, headers_with_tenant):
         """Test successful book creation."""
         book_data = {
             "title": "Test Book Title",
@@ -15,22 +24,18 @@ class TestBookEndpoints:
             "published_at": "2023-01-01"
         }
 
-        response = test_client.post(
+        response = await client.post(
             "/api/v1/books",
             json=book_data,
             headers=headers_with_tenant
         )
 
         assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-        assert data["title"] == book_data["title"]
-        assert data["author_id"] == book_data["author_id"]
-        assert float(data["price"]) == book_data["price"]
-        assert data["stock"] == book_data["stock"]
-        assert data["published_at"] == book_data["published_at"]
-        assert "id" in data
+        # Compare typed fields (Decimal price, date) rather than raw JSON
+        book = BookRead.model_validate_json(response.content)
+        assert book.model_dump(exclude={"id", "version"}) == BookCreate.model_validate(book_data).model_dump()
 
-    def test_create_book_without_optional_fields(self, test_client, bootstrap_tenant, sample_author, headers_with_tenant):
+    async def test_create_book_without_optional_fields(self, client, bootstrap_tenant, sample_author, headers_with_tenant):
         """Test creating book without optional fields."""
         book_data = {
             "title": "Simple Book",
@@ -39,7 +44,7 @@ class TestBookEndpoints:
             "stock": 5
         }
 
-        response = test_client.post(
+        response = await client.post(
             "/api/v1/books",
             json=book_data,
             headers=headers_with_tenant
@@ -50,7 +55,7 @@ class TestBookEndpoints:
         assert data["title"] == book_data["title"]
         assert data["published_at"] is None
 
-    def test_create_book_negative_price(self, test_client, bootstrap_tenant, sample_author, headers_with_tenant):
+    async def test_create_book_negative_price(self, client, bootstrap_tenant, sample_author, headers_with_tenant):
         """Test creating book with negative price."""
         book_data = {
             "title": "Negative Price Book",
@@ -59,7 +64,7 @@ class TestBookEndpoints:
             "stock": 5
         }
 
-        response = test_client.post(
+        response = await client.post(
             "/api/v1/books",
             json=book_data,
             headers=headers_with_tenant
@@ -68,7 +73,7 @@ class TestBookEndpoints:
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
         assert "price must be >= 0" in response.text
 
-    def test_create_book_negative_stock(self, test_client, bootstrap_tenant, sample_author, headers_with_tenant):
+    async def test_create_book_negative_stock(self, client, bootstrap_tenant, sample_author, headers_with_tenant):
         """Test creating book with negative stock."""
         book_data = {
             "title": "Negative Stock Book",
@@ -77,7 +82,7 @@ class TestBookEndpoints:
             "stock": -5
         }
 
-        response = test_client.post(
+        response = await client.post(
             "/api/v1/books",
             json=book_data,
             headers=headers_with_tenant
@@ -86,7 +91,7 @@ class TestBookEndpoints:
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
         # This should be caught by Pydantic validation
 
-    def test_create_book_empty_title(self, test_client, bootstrap_tenant, sample_author, headers_with_tenant):
+    async def test_create_book_empty_title(self, client, bootstrap_tenant, sample_author, headers_with_tenant):
         """Test creating book with empty title."""
         book_data = {
             "title": "   ",
@@ -95,7 +100,7 @@ class TestBookEndpoints:
             "stock": 5
         }
 
-        response = test_client.post(
+        response = await client.post(
             "/api/v1/books",
             json=book_data,
             headers=headers_with_tenant
@@ -104,7 +109,7 @@ class TestBookEndpoints:
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
         assert "title cannot be empty" in response.text
 
-    def test_create_book_trim_title(self, test_client, bootstrap_tenant, sample_author, headers_with_tenant):
+    async def test_create_book_trim_title(self, client, bootstrap_tenant, sample_author, headers_with_tenant):
         """Test that book title is trimmed."""
         book_data = {
             "title": "  Trimmed Book Title  ",
@@ -113,7 +118,7 @@ class TestBookEndpoints:
             "stock": 5
         }
 
-        response = test_client.post(
+        response = await client.post(
             "/api/v1/books",
             json=book_data,
             headers=headers_with_tenant
@@ -123,7 +128,37 @@ class TestBookEndpoints:
         data = response.json()
         assert data["title"] == "Trimmed Book Title"
 
-    def test_create_book_nonexistent_author(self, test_client, bootstrap_tenant, headers_with_tenant):
+    async def test_create_books_bulk(self, client, bootstrap_tenant, sample_author, headers_with_tenant):
+        """Test creating several books in one request."""
+        books_data = [
+            {"title": f"Bulk Book {i}", "author_id": sample_author["id"], "price": 9.99, "stock": i}
+            for i in range(3)
+        ]
+
+        response = await client.post("/api/v1/books/bulk", json=books_data, headers=headers_with_tenant)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [book["title"] for book in response.json()] == [book["title"] for book in books_data]
+        response = await client.get("/api/v1/books", headers=headers_with_tenant)
+        assert len(response.json()) == 3
+
+    async def test_create_books_bulk_all_or_nothing(self, client, bootstrap_tenant, sample_book, headers_with_tenant):
+        """Test a duplicate in the batch rejects the whole batch."""
+        books_data = [
+            {"title": "Fresh Book", "author_id": sample_book["author_id"], "price": 9.99, "stock": 1},
+            {key: sample_book[key] for key in ("title", "author_id", "price", "stock", "published_at")},
+        ]
+
+        response = await client.post("/api/v1/books/bulk", json=books_data, headers=headers_with_tenant)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = await client.post("/api/v1/books/bulk", json=[], headers=headers_with_tenant)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+        response = await client.get("/api/v1/books", headers=headers_with_tenant)
+        assert [book["id"] for book in response.json()] == [sample_book["id"]]
+
+    async def test_create_book_nonexistent_author(self, client, bootstrap_tenant, headers_with_tenant):
         """Test creating book with non-existent author."""
         book_data = {
             "title": "Orphan Book",
@@ -132,7 +167,7 @@ class TestBookEndpoints:
             "stock": 5
         }
 
-        response = test_client.post(
+        response = await client.post(
             "/api/v1/books",
             json=book_data,
             headers=headers_with_tenant
@@ -141,7 +176,7 @@ class TestBookEndpoints:
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         # Should fail at foreign key constraint level
 
-    def test_create_duplicate_book_same_author_year(self, test_client, bootstrap_tenant, sample_author, sample_book, headers_with_tenant):
+    async def test_create_duplicate_book_same_author_year(self, client, bootstrap_tenant, sample_author, sample_book, headers_with_tenant):
         """Test creating duplicate book (same title + author + year)."""
         book_data = {
             "title": sample_book["title"],
@@ -151,7 +186,7 @@ class TestBookEndpoints:
             "published_at": "2023-01-01"  # Same year as sample_book
         }
 
-        response = test_client.post(
+        response = await client.post(
             "/api/v1/books",
             json=book_data,
             headers=headers_with_tenant
@@ -160,7 +195,7 @@ class TestBookEndpoints:
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert "Duplicate book" in response.text
 
-    def test_create_duplicate_book_different_year(self, test_client, bootstrap_tenant, sample_author, sample_book, headers_with_tenant):
+    async def test_create_duplicate_book_different_year(self, client, bootstrap_tenant, sample_author, sample_book, headers_with_tenant):
         """Test creating book with same title and author but different year."""
         book_data = {
             "title": sample_book["title"],
@@ -170,7 +205,7 @@ class TestBookEndpoints:
             "published_at": "2024-01-01"  # Different year
         }
 
-        response = test_client.post(
+        response = await client.post(
             "/api/v1/books",
             json=book_data,
             headers=headers_with_tenant
@@ -179,16 +214,45 @@ class TestBookEndpoints:
         assert response.status_code == status.HTTP_200_OK
         # Should succeed as year is different
 
-    def test_list_books_empty(self, test_client, bootstrap_tenant, headers_with_tenant):
+    async def test_create_book_without_unique_index(self, client, tx_connection, bootstrap_tenant, sample_author, headers_with_tenant):
+        """Test a tenant bootstrapped before uq_books_author_title_year still creates and dedupes books."""
+        _ = await tx_connection.execute(text(f'DROP INDEX "{bootstrap_tenant}".uq_books_author_title_year'))
+        book_data = {
+            "title": "Pre-index Book",
+            "author_id": str(sample_author["id"]),
+            "price": 19.99,
+            "stock": 3,
+            "published_at": "2023-01-01"
+        }
+
+        response = await client.post("/api/v1/books", json=book_data, headers=headers_with_tenant)
+        assert response.status_code == status.HTTP_200_OK
+
+        response = await client.post("/api/v1/books", json=book_data, headers=headers_with_tenant)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "Duplicate book" in response.text
+
+    async def test_get_book(self, client, bootstrap_tenant, sample_book, headers_with_tenant):
+        """Test fetching a single book by ID."""
+        response = await client.get(f"/api/v1/books/{sample_book['id']}", headers=headers_with_tenant)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == sample_book
+
+    async def test_get_book_not_found(self, client, bootstrap_tenant, headers_with_tenant):
+        """Test fetching a book that does not exist."""
+        response = await client.get(f"/api/v1/books/{uuid.uuid4()}", headers=headers_with_tenant)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    async def test_list_books_empty(self, client, bootstrap_tenant, headers_with_tenant):
         """Test listing books when none exist."""
-        response = test_client.get("/api/v1/books", headers=headers_with_tenant)
+        response = await client.get("/api/v1/books", headers=headers_with_tenant)
 
         assert response.status_code == status.HTTP_200_OK
         assert response.json() == []
 
-    def test_list_books_with_data(self, test_client, bootstrap_tenant, sample_book, headers_with_tenant):
+    async def test_list_books_with_data(self, client, bootstrap_tenant, sample_book, headers_with_tenant):
         """Test listing books with existing data."""
-        response = test_client.get("/api/v1/books", headers=headers_with_tenant)
+        response = await client.get("/api/v1/books", headers=headers_with_tenant)
 
         assert response.status_code == status.HTTP_200_OK
         books = response.json()
@@ -196,11 +260,11 @@ class TestBookEndpoints:
         assert books[0]["id"] == str(sample_book["id"])
         assert books[0]["title"] == sample_book["title"]
 
-    def test_list_books_by_author(self, test_client, bootstrap_tenant, sample_author, sample_book, headers_with_tenant):
+    async def test_list_books_by_author(self, client, bootstrap_tenant, sample_author, sample_book, headers_with_tenant):
         """Test filtering books by author."""
         # Create another author and book
         other_author_data = {"name": "Other Author"}
-        response = test_client.post(
+        response = await client.post(
             "/api/v1/authors",
             json=other_author_data,
             headers=headers_with_tenant
@@ -213,14 +277,14 @@ class TestBookEndpoints:
             "price": 25.99,
             "stock": 8
         }
-        test_client.post(
+        await client.post(
             "/api/v1/books",
             json=other_book_data,
             headers=headers_with_tenant
         )
 
         # Filter by original author
-        response = test_client.get(
+        response = await client.get(
             f"/api/v1/books?author_id={sample_author['id']}",
             headers=headers_with_tenant
         )
@@ -230,7 +294,7 @@ class TestBookEndpoints:
         assert len(books) == 1
         assert books[0]["author_id"] == str(sample_author["id"])
 
-    def test_list_books_search(self, test_client, bootstrap_tenant, sample_author, sample_book, headers_with_tenant):
+    async def test_list_books_search(self, client, bootstrap_tenant, sample_author, sample_book, headers_with_tenant):
         """Test searching books by title."""
         # Create another book
         search_book_data = {
@@ -239,14 +303,14 @@ class TestBookEndpoints:
             "price": 35.99,
             "stock": 6
         }
-        test_client.post(
+        await client.post(
             "/api/v1/books",
             json=search_book_data,
             headers=headers_with_tenant
         )
 
         # Search for "Searchable"
-        response = test_client.get(
+        response = await client.get(
             "/api/v1/books?q=Searchable",
             headers=headers_with_tenant
         )
@@ -256,40 +320,20 @@ class TestBookEndpoints:
         assert len(books) == 1
         assert "Searchable" in books[0]["title"]
 
-    def test_list_books_sort_by_title(self, test_client, bootstrap_tenant, sample_author, headers_with_tenant):
+    async def test_list_books_sort_by_title(self, client, bootstrap_tenant, many_books, headers_with_tenant):
         """Test sorting books by title."""
-        # Create multiple books with different titles
-        books_data = [
-            {"title": "Zebra Book", "author_id": str(sample_author["id"]), "price": 10.99, "stock": 2},
-            {"title": "Apple Book", "author_id": str(sample_author["id"]), "price": 15.99, "stock": 3},
-            {"title": "Banana Book", "author_id": str(sample_author["id"]), "price": 12.99, "stock": 4}
-        ]
-
-        for book_data in books_data:
-            test_client.post("/api/v1/books", json=book_data, headers=headers_with_tenant)
-
         # Sort by title
-        response = test_client.get("/api/v1/books?sort=title", headers=headers_with_tenant)
+        response = await client.get("/api/v1/books?sort=title", headers=headers_with_tenant)
 
         assert response.status_code == status.HTTP_200_OK
         books = response.json()
         titles = [book["title"] for book in books]
         assert titles == sorted(titles)
 
-    def test_list_books_pagination(self, test_client, bootstrap_tenant, sample_author, headers_with_tenant):
+    async def test_list_books_pagination(self, client, bootstrap_tenant, many_books, headers_with_tenant):
         """Test book pagination."""
-        # Create multiple books
-        for i in range(25):
-            book_data = {
-                "title": f"Book {i:02d}",
-                "author_id": str(sample_author["id"]),
-                "price": 10.99 + i,
-                "stock": i + 1
-            }
-            test_client.post("/api/v1/books", json=book_data, headers=headers_with_tenant)
-
         # Test limit and offset
-        response = test_client.get("/api/v1/books?limit=10&offset=5", headers=headers_with_tenant)
+        response = await client.get("/api/v1/books?limit=10&offset=5", headers=headers_with_tenant)
 
         assert response.status_code == status.HTTP_200_OK
         books = response.json()
@@ -298,42 +342,68 @@ class TestBookEndpoints:
         assert books[0]["title"] == "Book 05"
         assert books[-1]["title"] == "Book 14"
 
-    def test_list_books_invalid_sort_field(self, test_client, bootstrap_tenant, headers_with_tenant):
-        """Test sorting with invalid field."""
-        response = test_client.get("/api/v1/books?sort=invalid_field", headers=headers_with_tenant)
+    async def test_list_books_cursor_pagination(self, client, bootstrap_tenant, sample_author, headers_with_tenant):
+        """Test keyset pagination via X-Next-Cursor."""
+        for i in range(5):
+            book_data = {
+                "title": f"Book {i:02d}",
+                "author_id": str(sample_author["id"]),
+                "price": 10.99,
+                "stock": 1,
+                "published_at": None if i == 3 else f"202{i}-01-01",
+            }
+            await client.post("/api/v1/books", json=book_data, headers=headers_with_tenant)
+
+        for sort in ("title", "published_at"):
+            seen = []
+            url = f"/api/v1/books?limit=2&sort={sort}"
+            while True:
+                response = await client.get(url, headers=headers_with_tenant)
+                assert response.status_code == status.HTTP_200_OK
+                seen.extend(book["title"] for book in response.json())
+                cursor = response.headers.get("X-Next-Cursor")
+                if cursor is None:
+                    break
+                url = f"/api/v1/books?limit=2&sort={sort}&cursor={cursor}"
+
+            # Undated books sort last
+            expected = ["Book 00", "Book 01", "Book 02", "Book 04", "Book 03"]
+            assert seen == (sorted(expected) if sort == "title" else expected)
+
+    async def test_list_books_invalid_cursor(self, client, bootstrap_tenant, headers_with_tenant):
+        """Test malformed or mismatched cursors are rejected."""
+        response = await client.get("/api/v1/books?cursor=not-a-cursor", headers=headers_with_tenant)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
 
-        assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+        cursor = encode_cursor("published_at", "2020-01-01", uuid.uuid4())
+        response = await client.get(f"/api/v1/books?sort=title&cursor={cursor}", headers=headers_with_tenant)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
 
-    def test_list_books_pagination_limits(self, test_client, bootstrap_tenant, headers_with_tenant):
-        """Test pagination limits."""
-        response = test_client.get("/api/v1/books?limit=101", headers=headers_with_tenant)
-        assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+    async def test_list_books_invalid_sort_field(self, client, bootstrap_tenant, headers_with_tenant):
+        """Test sorting with invalid field."""
+        response = await client.get("/api/v1/books?sort=invalid_field", headers=headers_with_tenant)
 
-        response = test_client.get("/api/v1/books?limit=0", headers=headers_with_tenant)
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
 
-        response = test_client.get("/api/v1/books?limit=-1", headers=headers_with_tenant)
+    @pytest.mark.parametrize("limit", [101, 0, -1])
+    async def test_list_books_pagination_limits(self, client, bootstrap_tenant, headers_with_tenant, limit):
+        """Test pagination limits."""
+        response = await client.get(f"/api/v1/books?limit={limit}", headers=headers_with_tenant)
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
 
-    def test_book_tenant_isolation(self, test_client, bootstrap_tenant, sample_book):
+    async def test_book_tenant_isolation(self, client, bootstrap_tenant, sample_book, headers_with_tenant, headers_other_tenant):
         """Test that books are properly isolated by tenant."""
-        # Create another tenant
-        other_tenant = "other_tenant"
-        test_client.post(f"/api/v1/tenants/{other_tenant}/bootstrap", headers={"X-Tenant": other_tenant})
-
         # Original tenant should see the book
-        headers1 = {"X-Tenant": bootstrap_tenant}
-        response1 = test_client.get("/api/v1/books", headers=headers1)
+        response1 = await client.get("/api/v1/books", headers=headers_with_tenant)
         assert response1.status_code == status.HTTP_200_OK
         assert len(response1.json()) == 1
 
         # Other tenant should not see the book
-        headers2 = {"X-Tenant": other_tenant}
-        response2 = test_client.get("/api/v1/books", headers=headers2)
+        response2 = await client.get("/api/v1/books", headers=headers_other_tenant)
         assert response2.status_code == status.HTTP_200_OK
         assert len(response2.json()) == 0
 
-    def test_book_version_field(self, test_client, bootstrap_tenant, sample_author, headers_with_tenant):
+    async def test_book_version_field(self, client, bootstrap_tenant, sample_author, headers_with_tenant):
         """Test that book version field is properly set."""
         book_data = {
             "title": "Version Test Book",
@@ -342,7 +412,7 @@ class TestBookEndpoints:
             "stock": 10
         }
 
-        response = test_client.post(
+        response = await client.post(
             "/api/v1/books",
             json=book_data,
             headers=headers_with_tenant
@@ -352,7 +422,7 @@ class TestBookEndpoints:
         data = response.json()
         assert data["version"] == 1
 
-    def test_book_missing_tenant_header(self, test_client, bootstrap_tenant, sample_author):
+    async def test_book_missing_tenant_header(self, client, bootstrap_tenant, sample_author):
         """Test book endpoints without tenant header."""
         book_data = {
             "title": "No Tenant Book",
@@ -361,8 +431,8 @@ class TestBookEndpoints:
             "stock": 5
         }
 
-        response = test_client.post("/api/v1/books", json=book_data)
+        response = await client.post("/api/v1/books", json=book_data)
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
-        response = test_client.get("/api/v1/books")
+        response = await client.get("/api/v1/books")
         assert response.status_code == status.HTTP_400_BAD_REQUEST
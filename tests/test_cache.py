@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.utils import idem_cache
+from app.core.cache import (
+    cache_key,
+    cached_response,
+    claim_idempotency,
+    get_cached,
+    invalidate,
+    release_idempotency,
+    set_cached,
+    store_idempotency,
+)
+
+
+def _request(tenant: str, query: list[tuple[str, str]]) -> Mock:
+    request = Mock()
+    request.state.tenant = tenant
+    request.query_params.multi_items.return_value = query
+    return request
+
+
+class TestCacheKey:
+    """Test cache key canonicalization."""
+
+    def test_key_includes_tenant_and_resource(self):
+        key = cache_key(_request("acme", [("limit", "10")]), "books", 3)
+        assert key == "acme:books:3:limit=10"
+
+    def test_key_ignores_query_param_order(self):
+        key1 = cache_key(_request("acme", [("q", "x"), ("limit", "10")]), "books")
+        key2 = cache_key(_request("acme", [("limit", "10"), ("q", "x")]), "books")
+        assert key1 == key2
+
+    def test_key_differs_per_tenant(self):
+        key1 = cache_key(_request("acme", []), "books")
+        key2 = cache_key(_request("other", []), "books")
+        assert key1 != key2
+
+    def test_key_differs_per_generation(self):
+        key1 = cache_key(_request("acme", []), "books", 1)
+        key2 = cache_key(_request("acme", []), "books", 2)
+        assert key1 != key2
+
+
+class TestCacheDisabled:
+    """Without REDIS_URL every operation is a pass-through."""
+
+    @pytest.mark.asyncio
+    async def test_get_set_invalidate_noop(self):
+        await set_cached("acme:books:", b"[]")
+        assert await get_cached("acme:books:") is None
+        await invalidate("acme", "books")
+
+    @pytest.mark.asyncio
+    async def test_cached_response_renders_every_time(self):
+        render = AsyncMock(return_value=(b"[]", {}))
+        request = _request("acme", [])
+
+        response1 = await cached_response(request, "books", render)
+        response2 = await cached_response(request, "books", render)
+
+        assert render.await_count == 2
+        assert response1.body == response2.body == b"[]"
+        assert response1.media_type == "application/json"
+
+
+class TestCacheEnabled:
+    """Cache behaviour against a stand-in client."""
+
+    @pytest.mark.asyncio
+    async def test_cached_response_serves_hit(self):
+        client = AsyncMock()
+        client.get.side_effect = [b"2", b'{"X-Next-Cursor": "abc"}\n[{"id": 1}]']
+        render = AsyncMock()
+
+        with patch("app.core.cache._client", client):
+            response = await cached_response(_request("acme", []), "books", render)
+
+        render.assert_not_awaited()
+        assert client.get.call_args_list[1][0] == ("acme:books:2:",)
+        assert response.body == b'[{"id": 1}]'
+        assert response.headers["X-Next-Cursor"] == "abc"
+
+    @pytest.mark.asyncio
+    async def test_cached_response_stores_miss(self):
+        client = AsyncMock()
+        client.get.return_value = None
+        render = AsyncMock(return_value=(b"[]", {}))
+
+        with patch("app.core.cache._client", client):
+            _ = await cached_response(_request("acme", []), "books", render)
+
+        render.assert_awaited_once()
+        client.set.assert_awaited_once()
+        assert client.set.call_args[0][:2] == ("acme:books:0:", b"{}\n[]")
+
+    @pytest.mark.asyncio
+    async def test_read_error_falls_back_to_render(self):
+        client = AsyncMock()
+        client.get.side_effect = ConnectionError("redis down")
+        render = AsyncMock(return_value=(b"[]", {}))
+
+        with patch("app.core.cache._client", client):
+            response = await cached_response(_request("acme", []), "books", render)
+
+        render.assert_awaited_once()
+        assert response.body == b"[]"
+
+    @pytest.mark.asyncio
+    async def test_invalidate_bumps_generation(self):
+        client = AsyncMock()
+
+        with patch("app.core.cache._client", client):
+            await invalidate("acme", "books")
+
+        client.incr.assert_awaited_once_with("gen:acme:books")
+        client.delete.assert_not_awaited()
+
+
+class TestIdempotency:
+    """Redis fast path for Idempotency-Key replays."""
+
+    @pytest.mark.asyncio
+    async def test_claim_disabled(self):
+        assert await claim_idempotency("acme", "k1") == (False, None)
+
+    @pytest.mark.asyncio
+    async def test_first_claim_sets_pending(self):
+        client = AsyncMock()
+        client.set.return_value = True
+
+        with patch("app.core.cache._client", client):
+            assert await claim_idempotency("acme", "k1") == (True, None)
+
+        assert client.set.call_args[0] == ("idem:acme:k1", b"pending")
+        assert client.set.call_args[1]["nx"] is True
+        client.get.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_repeat_claim_returns_stored_body(self):
+        client = AsyncMock()
+        client.set.return_value = None
+        client.get.return_value = b'{"status": "CONFIRMED"}'
+
+        with patch("app.core.cache._client", client):
+            assert await claim_idempotency("acme", "k1") == (False, b'{"status": "CONFIRMED"}')
+
+    @pytest.mark.asyncio
+    async def test_in_flight_claim_returns_nothing(self):
+        client = AsyncMock()
+        client.set.return_value = None
+        client.get.return_value = b"pending"
+
+        with patch("app.core.cache._client", client):
+            assert await claim_idempotency("acme", "k1") == (False, None)
+
+    @pytest.mark.asyncio
+    async def test_store_and_release(self):
+        client = AsyncMock()
+
+        with patch("app.core.cache._client", client):
+            await store_idempotency("acme", "k1", b"{}")
+            await release_idempotency("acme", "k1")
+
+        assert client.set.call_args[0] == ("idem:acme:k1", b"{}")
+        client.delete.assert_awaited_once_with("idem:acme:k1")
+
+
+class TestIdempotencyMemoryCache:
+    """Per-process cache in front of the idempotency_keys lookup."""
+
+    def setup_method(self):
+        idem_cache.clear()
+
+    def test_put_then_get(self):
+        idem_cache.put("acme", "k1", {"status": "CONFIRMED"})
+        assert idem_cache.get("acme", "k1") == {"status": "CONFIRMED"}
+        assert idem_cache.get("other", "k1") is None
+
+    def test_expired_entry_is_dropped(self):
+        with patch("app.utils.idem_cache.time.monotonic", return_value=0.0):
+            idem_cache.put("acme", "k1", {"status": "CONFIRMED"})
+        with patch("app.utils.idem_cache.time.monotonic", return_value=301.0):
+            assert idem_cache.get("acme", "k1") is None
+
+    def test_evicts_least_recently_used(self):
+        with patch("app.utils.idem_cache._MAX_ENTRIES", 2):
+            idem_cache.put("acme", "k1", {})
+            idem_cache.put("acme", "k2", {})
+            _ = idem_cache.get("acme", "k1")
+            idem_cache.put("acme", "k3", {})
+        assert idem_cache.get("acme", "k1") == {}
+        assert idem_cache.get("acme", "k2") is None
+
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import pytest
 import json
-from unittest.mock import Mock, AsyncMock, patch
+from types import SimpleNamespace
+from unittest.mock import patch
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import IntegrityError
@@ -13,9 +14,19 @@ from app.core.errors import (
     ErrorBody,
     ErrorEnvelope,
     _build_meta,
-    _serialize_validation_errors,
     register_exception_handlers,
 )
+from app.main import app
+
+
+@pytest.fixture
+def mock_request():
+    """Request stand-in with just the attributes the handlers read."""
+    return SimpleNamespace(
+        state=SimpleNamespace(ctx={"request_id": "test-123", "tenant": "test_tenant"}),
+        url=SimpleNamespace(path="/test"),
+        method="GET",
+    )
 
 
 class TestErrorModels:
@@ -46,17 +57,23 @@ class TestErrorModels:
         assert envelope.error == error_body
         assert envelope.meta == meta
 
+    def test_error_envelope_in_openapi(self):
+        """Test API routes document ErrorEnvelope instead of FastAPI's 422 schema."""
+        schema = app.openapi()
+        responses = schema["paths"]["/api/v1/books"]["post"]["responses"]
+
+        assert responses["4XX"]["content"]["application/json"]["schema"] == {
+            "$ref": "#/components/schemas/ErrorEnvelope"
+        }
+        assert "422" not in responses
+
 
 class TestErrorHelpers:
     """Test error helper functions."""
 
-    def test_build_meta_with_correlation_id(self):
+    def test_build_meta_with_correlation_id(self, mock_request):
         """Test _build_meta with correlation ID."""
-        mock_request = Mock()
-        mock_request.state.correlation_id = "test-123"
-        mock_request.state.tenant = "test_tenant"
         mock_request.url.path = "/test/path"
-        mock_request.method = "GET"
 
         meta = _build_meta(mock_request)
 
@@ -65,26 +82,22 @@ class TestErrorHelpers:
         assert meta["path"] == "/test/path"
         assert meta["method"] == "GET"
 
-    def test_build_meta_without_correlation_id(self):
-        """Test _build_meta without correlation ID."""
-        mock_request = Mock()
-        del mock_request.state.correlation_id  # Remove attribute
-        mock_request.state.tenant = "test_tenant"
+    def test_build_meta_without_context(self, mock_request):
+        """Test _build_meta for a request the middlewares never saw."""
+        del mock_request.state.ctx  # Remove attribute
         mock_request.url.path = "/test/path"
         mock_request.method = "POST"
 
         meta = _build_meta(mock_request)
 
         assert meta["request_id"] == "-"
-        assert meta["tenant"] == "test_tenant"
+        assert meta["tenant"] == "-"
         assert meta["path"] == "/test/path"
         assert meta["method"] == "POST"
 
-    def test_build_meta_without_tenant(self):
+    def test_build_meta_without_tenant(self, mock_request):
         """Test _build_meta without tenant."""
-        mock_request = Mock()
-        mock_request.state.correlation_id = "test-123"
-        del mock_request.state.tenant  # Remove attribute
+        mock_request.state.ctx = {"request_id": "test-123", "tenant": "-"}
         mock_request.url.path = "/test/path"
         mock_request.method = "PUT"
 
@@ -95,74 +108,20 @@ class TestErrorHelpers:
         assert meta["path"] == "/test/path"
         assert meta["method"] == "PUT"
 
-    def test_serialize_validation_errors_empty(self):
-        """Test _serialize_validation_errors with empty list."""
-        result = _serialize_validation_errors([])
-        assert result == []
-
-    def test_serialize_validation_errors_simple(self):
-        """Test _serialize_validation_errors with simple errors."""
-        errors = [{"loc": ["field1"], "msg": "error1", "type": "type1"}]
-        result = _serialize_validation_errors(errors)
-        assert result == errors
-
-    def test_serialize_validation_errors_with_context(self):
-        """Test _serialize_validation_errors with context containing non-serializable objects."""
-        class CustomError:
-            def __str__(self):
-                return "Custom error message"
-
-        error = {
-            "loc": ["field1"],
-            "msg": "error1",
-            "type": "type1",
-            "ctx": {"error": CustomError(), "other": "value"}
-        }
-
-        result = _serialize_validation_errors([error])
-
-        assert result[0]["loc"] == ["field1"]
-        assert result[0]["msg"] == "error1"
-        assert result[0]["type"] == "type1"
-        assert result[0]["ctx"]["other"] == "value"
-        assert result[0]["ctx"]["error"] == "Custom error message"
-
-    def test_serialize_validation_errors_without_context(self):
-        """Test _serialize_validation_errors with context without error key."""
-        error = {
-            "loc": ["field1"],
-            "msg": "error1",
-            "type": "type1",
-            "ctx": {"other": "value"}
-        }
-
-        result = _serialize_validation_errors([error])
-
-        assert result[0]["ctx"]["other"] == "value"
-        assert "error" not in result[0]["ctx"]
-
 
 class TestExceptionHandlers:
     """Test exception handler registration and execution."""
 
-    def setup_method(self):
-        """Set up test app for each test."""
-        self.app = FastAPI()
-        register_exception_handlers(self.app)
+    @classmethod
+    def setup_class(cls):
+        """Set up one test app for the class; tests only read its handlers."""
+        cls.app = FastAPI()
+        register_exception_handlers(cls.app)
 
-    @patch('app.core.errors.get_logger')
+    @patch('app.core.errors.logger')
     @pytest.mark.asyncio
-    async def test_http_exception_handler_with_dict_detail(self, mock_get_logger):
+    async def test_http_exception_handler_with_dict_detail(self, mock_logger, mock_request):
         """Test HTTP exception handler with dict detail (covers lines 103-127)."""
-        mock_logger = Mock()
-        mock_get_logger.return_value = mock_logger
-
-        mock_request = Mock()
-        mock_request.state.correlation_id = "test-123"
-        mock_request.state.tenant = "test_tenant"
-        mock_request.url.path = "/test"
-        mock_request.method = "GET"
-
         # Create exception with dict detail
         exc = StarletteHTTPException(
             status_code=HTTP_400_BAD_REQUEST,
@@ -182,17 +141,10 @@ class TestExceptionHandlers:
         # Verify logging
         mock_logger.warning.assert_called_once_with("HTTP error", extra={"status_code": HTTP_400_BAD_REQUEST})
 
-    @patch('app.core.errors.get_logger')
+    @patch('app.core.errors.logger')
     @pytest.mark.asyncio
-    async def test_http_exception_handler_with_string_detail(self, mock_get_logger):
+    async def test_http_exception_handler_with_string_detail(self, mock_logger, mock_request):
         """Test HTTP exception handler with string detail."""
-        mock_logger = Mock()
-        mock_get_logger.return_value = mock_logger
-
-        mock_request = Mock()
-        mock_request.state.correlation_id = "test-123"
-        mock_request.state.tenant = "test_tenant"
-        mock_request.url.path = "/test"
         mock_request.method = "POST"
 
         exc = StarletteHTTPException(
@@ -208,17 +160,10 @@ class TestExceptionHandlers:
         assert hasattr(response, 'body')  # Response has body
         assert hasattr(response, 'status_code')  # Response has status code
 
-    @patch('app.core.errors.get_logger')
+    @patch('app.core.errors.logger')
     @pytest.mark.asyncio
-    async def test_http_exception_handler_long_detail(self, mock_get_logger):
+    async def test_http_exception_handler_long_detail(self, mock_logger, mock_request):
         """Test HTTP exception handler with very long detail."""
-        mock_logger = Mock()
-        mock_get_logger.return_value = mock_logger
-
-        mock_request = Mock()
-        mock_request.state.correlation_id = "test-123"
-        mock_request.state.tenant = "test_tenant"
-        mock_request.url.path = "/test"
         mock_request.method = "PUT"
 
         # Create very long detail string
@@ -236,17 +181,10 @@ class TestExceptionHandlers:
         assert hasattr(response, 'body')  # Response has body
         assert hasattr(response, 'status_code')  # Response has status code
 
-    @patch('app.core.errors.get_logger')
+    @patch('app.core.errors.logger')
     @pytest.mark.asyncio
-    async def test_validation_exception_handler(self, mock_get_logger):
+    async def test_validation_exception_handler(self, mock_logger, mock_request):
         """Test validation exception handler."""
-        mock_logger = Mock()
-        mock_get_logger.return_value = mock_logger
-
-        mock_request = Mock()
-        mock_request.state.correlation_id = "test-123"
-        mock_request.state.tenant = "test_tenant"
-        mock_request.url.path = "/test"
         mock_request.method = "POST"
 
         # Create validation error
@@ -267,17 +205,34 @@ class TestExceptionHandlers:
         # Verify logging
         mock_logger.info.assert_called_once_with("Validation error")
 
-    @patch('app.core.errors.get_logger')
+    @patch('app.core.errors.logger')
     @pytest.mark.asyncio
-    async def test_integrity_error_foreign_key_constraint(self, mock_get_logger):
-        """Test integrity error handler with foreign key constraint (covers lines 103-139)."""
-        mock_logger = Mock()
-        mock_get_logger.return_value = mock_logger
+    async def test_validation_exception_handler_with_context(self, mock_logger, mock_request):
+        """Test non-serializable objects in validation error context are stringified."""
+        class CustomError:
+            def __str__(self):
+                return "Custom error message"
 
-        mock_request = Mock()
-        mock_request.state.correlation_id = "test-123"
-        mock_request.state.tenant = "test_tenant"
-        mock_request.url.path = "/test"
+        mock_request.method = "POST"
+
+        errors = [
+            {"loc": ["field1"], "msg": "error1", "type": "type1", "ctx": {"error": CustomError(), "other": "value"}},
+            {"loc": ["field2"], "msg": "error2", "type": "type2", "ctx": {"other": "value"}},
+        ]
+        exc = RequestValidationError(errors)
+
+        handler = self.app.exception_handlers.get(RequestValidationError)
+        response = await handler(mock_request, exc)
+
+        result = json.loads(response.body)["error"]["details"]["errors"]
+        assert result[0]["loc"] == ["field1"]
+        assert result[0]["ctx"] == {"error": "Custom error message", "other": "value"}
+        assert result[1]["ctx"] == {"other": "value"}
+
+    @patch('app.core.errors.logger')
+    @pytest.mark.asyncio
+    async def test_integrity_error_foreign_key_constraint(self, mock_logger, mock_request):
+        """Test integrity error handler with foreign key constraint (covers lines 103-139)."""
         mock_request.method = "POST"
 
         # Create integrity error with foreign key constraint
@@ -300,17 +255,10 @@ class TestExceptionHandlers:
             extra={"error": str(exc)}
         )
 
-    @patch('app.core.errors.get_logger')
+    @patch('app.core.errors.logger')
     @pytest.mark.asyncio
-    async def test_integrity_error_unique_constraint(self, mock_get_logger):
+    async def test_integrity_error_unique_constraint(self, mock_logger, mock_request):
         """Test integrity error handler with unique constraint."""
-        mock_logger = Mock()
-        mock_get_logger.return_value = mock_logger
-
-        mock_request = Mock()
-        mock_request.state.correlation_id = "test-123"
-        mock_request.state.tenant = "test_tenant"
-        mock_request.url.path = "/test"
         mock_request.method = "PUT"
 
         # Create integrity error with unique constraint
@@ -335,17 +283,10 @@ class TestExceptionHandlers:
             extra={"error": str(exc)}
         )
 
-    @patch('app.core.errors.get_logger')
+    @patch('app.core.errors.logger')
     @pytest.mark.asyncio
-    async def test_integrity_error_check_constraint(self, mock_get_logger):
+    async def test_integrity_error_check_constraint(self, mock_logger, mock_request):
         """Test integrity error handler with check constraint."""
-        mock_logger = Mock()
-        mock_get_logger.return_value = mock_logger
-
-        mock_request = Mock()
-        mock_request.state.correlation_id = "test-123"
-        mock_request.state.tenant = "test_tenant"
-        mock_request.url.path = "/test"
         mock_request.method = "POST"
 
         # Create integrity error with check constraint
@@ -370,17 +311,10 @@ class TestExceptionHandlers:
             extra={"error": str(exc)}
         )
 
-    @patch('app.core.errors.get_logger')
+    @patch('app.core.errors.logger')
     @pytest.mark.asyncio
-    async def test_integrity_error_generic(self, mock_get_logger):
+    async def test_integrity_error_generic(self, mock_logger, mock_request):
         """Test integrity error handler with generic integrity error."""
-        mock_logger = Mock()
-        mock_get_logger.return_value = mock_logger
-
-        mock_request = Mock()
-        mock_request.state.correlation_id = "test-123"
-        mock_request.state.tenant = "test_tenant"
-        mock_request.url.path = "/test"
         mock_request.method = "DELETE"
 
         original_error = Exception("some other integrity violation")
@@ -397,17 +331,10 @@ class TestExceptionHandlers:
         assert hasattr(response, 'body')
         assert hasattr(response, 'status_code')
 
-    @patch('app.core.errors.get_logger')
+    @patch('app.core.errors.logger')
     @pytest.mark.asyncio
-    async def test_integrity_error_without_orig(self, mock_get_logger):
+    async def test_integrity_error_without_orig(self, mock_logger, mock_request):
         """Test integrity error handler when original error is not available."""
-        mock_logger = Mock()
-        mock_get_logger.return_value = mock_logger
-
-        mock_request = Mock()
-        mock_request.state.correlation_id = "test-123"
-        mock_request.state.tenant = "test_tenant"
-        mock_request.url.path = "/test"
         mock_request.method = "POST"
 
         # Create integrity error without orig attribute
@@ -434,19 +361,26 @@ class TestExceptionHandlers:
             extra={"error": str(exc)}
         )
 
-    @patch('app.core.errors.get_logger')
+    @patch('app.core.errors.logger')
     @pytest.mark.asyncio
-    async def test_unhandled_exception_handler(self, mock_get_logger):
-        """Test unhandled exception handler (covers lines 133-139)."""
-        mock_logger = Mock()
-        mock_get_logger.return_value = mock_logger
+    async def test_integrity_error_warning_disabled(self, mock_logger, mock_request):
+        """Test the integrity error is not formatted when WARNING is disabled."""
+        mock_logger.isEnabledFor.return_value = False
+
+        mock_request.method = "POST"
+
+        exc = IntegrityError("statement", "params", orig=Exception("unique constraint violated"))
 
-        mock_request = Mock()
-        mock_request.state.correlation_id = "test-123"
-        mock_request.state.tenant = "test_tenant"
-        mock_request.url.path = "/test"
-        mock_request.method = "GET"
+        handler = self.app.exception_handlers.get(IntegrityError)
+        response = await handler(mock_request, exc)
 
+        assert response.status_code == HTTP_400_BAD_REQUEST
+        mock_logger.warning.assert_not_called()
+
+    @patch('app.core.errors.logger')
+    @pytest.mark.asyncio
+    async def test_unhandled_exception_handler(self, mock_logger, mock_request):
+        """Test unhandled exception handler (covers lines 133-139)."""
         # Create generic exception
         exc = Exception("Unexpected error")
 
@@ -461,7 +395,6 @@ class TestExceptionHandlers:
 
         # Verify logging with exception info
         mock_logger.exception.assert_called_once_with("Unhandled server error", exc_info=exc)
-        mock_logger.exception.assert_called_once_with("Unhandled server error", exc_info=exc)
 
 
 class TestExceptionHandlerRegistration:
@@ -484,6 +417,15 @@ class TestExceptionHandlerRegistration:
         assert callable(app.exception_handlers[IntegrityError])
         assert callable(app.exception_handlers[Exception])
 
+    def test_register_exception_handlers_shares_handlers(self):
+        """Test that apps reuse the module-level handler functions."""
+        first, second = FastAPI(), FastAPI()
+        register_exception_handlers(first)
+        register_exception_handlers(second)
+
+        for exc_class in (StarletteHTTPException, RequestValidationError, IntegrityError, Exception):
+            assert first.exception_handlers[exc_class] is second.exception_handlers[exc_class]
+
     def test_register_exception_handlers_returns_none(self):
         """Test that register_exception_handlers returns None."""
         app = FastAPI()
@@ -18,135 +18,141 @@ from decimal import Decimal
 class TestAuthorRepository:
     """Test author repository layer."""
 
-    def test_create_author(self, db_session):
+    @pytest.mark.asyncio
+    async def test_create_author(self, db_session):
         """Test creating an author through repository."""
         # Create a schema for this test
         tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
 
         from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
 
         try:
             author_data = AuthorCreate(name="Test Author", email="test@author.com")
-            author = AuthorRepository.create(db_session, author_data)
+            author = await AuthorRepository.create(db_session, author_data)
 
             assert author.name == "Test Author"
             assert author.email == "test@author.com"
             assert author.id is not None
         finally:
             # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
 
-    def test_list_authors_empty(self, db_session):
+    @pytest.mark.asyncio
+    async def test_list_authors_empty(self, db_session):
         """Test listing authors when none exist."""
         # Create a schema for this test
         tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
 
         from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
 
         try:
-            authors = AuthorRepository.list(db_session)
+            authors = await AuthorRepository.list(db_session)
             assert authors == []
         finally:
             # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
 
-    def test_list_authors_with_data(self, db_session):
+    @pytest.mark.asyncio
+    async def test_list_authors_with_data(self, db_session):
         """Test listing authors with existing data."""
         # Create a schema for this test
         tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
 
         from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
 
         try:
             # Create an author directly
             author_data = AuthorCreate(name="Test Author", email="test@author.com")
-            created_author = AuthorRepository.create(db_session, author_data)
+            created_author = await AuthorRepository.create(db_session, author_data)
 
-            authors = AuthorRepository.list(db_session)
+            authors = await AuthorRepository.list(db_session)
             assert len(authors) == 1
             assert authors[0].id == created_author.id
             assert authors[0].name == created_author.name
         finally:
             # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
 
-    def test_get_author_by_email(self, db_session):
+    @pytest.mark.asyncio
+    async def test_get_author_by_email(self, db_session):
         """Test getting author by email (available method)."""
         # Create a schema for this test
         tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
 
         from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
 
         try:
             # Create an author first
             author_data = AuthorCreate(name="Test Author", email="test@author.com")
-            created_author = AuthorRepository.create(db_session, author_data)
+            created_author = await AuthorRepository.create(db_session, author_data)
 
-            author = AuthorRepository.get_by_email(db_session, "test@author.com")
+            author = await AuthorRepository.get_by_email(db_session, "test@author.com")
             assert author is not None
             assert author.id == created_author.id
         finally:
             # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
 
-    def test_get_nonexistent_author(self, db_session):
+    @pytest.mark.asyncio
+    async def test_get_nonexistent_author(self, db_session):
         """Test getting non-existent author."""
         # Create a schema for this test
         tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
 
         from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
 
         try:
-            author = AuthorRepository.get_by_email(db_session, "nonexistent@test.com")
+            author = await AuthorRepository.get_by_email(db_session, "nonexistent@test.com")
             assert author is None
         finally:
             # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
 
 
 class TestBookRepository:
     """Test book repository layer."""
 
-    def test_create_book(self, db_session):
+    @pytest.mark.asyncio
+    async def test_create_book(self, db_session):
         """Test creating a book through repository."""
         # Create a schema for this test
         tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
 
         from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
 
         try:
             # Create author first
             author_data = AuthorCreate(name="Test Author", email="test@author.com")
-            author = AuthorRepository.create(db_session, author_data)
+            author = await AuthorRepository.create(db_session, author_data)
 
             book_data = BookCreate(
                 title="Test Book",
@@ -155,7 +161,7 @@ class TestBookRepository:
                 stock=10,
                 published_at=date(2023, 1, 1)
             )
-            book = BookRepository.create(db_session, book_data)
+            book = await BookRepository.create(db_session, book_data)
 
             assert book.title == "Test Book"
             assert book.author_id == author.id
@@ -164,43 +170,45 @@ class TestBookRepository:
             assert book.version == 1
         finally:
             # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
 
-    def test_list_books_empty(self, db_session):
+    @pytest.mark.asyncio
+    async def test_list_books_empty(self, db_session):
         """Test listing books when none exist."""
         # Create a schema for this test
         tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
 
         from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
 
         try:
-            books = BookRepository.list(db_session)
+            books = await BookRepository.list(db_session)
             assert books == []
         finally:
             # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
 
-    def test_list_books_with_filters(self, db_session):
+    @pytest.mark.asyncio
+    async def test_list_books_with_filters(self, db_session):
         """Test listing books with various filters."""
         # Create a schema for this test
         tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
 
         from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
 
         try:
             # Create author first
             author_data = AuthorCreate(name="Test Author", email="test@author.com")
-            author = AuthorRepository.create(db_session, author_data)
+            author = await AuthorRepository.create(db_session, author_data)
 
             # Create multiple books
             books_data = [
@@ -210,37 +218,38 @@ class TestBookRepository:
             ]
 
             for book_data in books_data:
-                BookRepository.create(db_session, book_data)
+                await BookRepository.create(db_session, book_data)
 
             # Test search filter
-            books = BookRepository.list(db_session, q="Alpha")
+            books = await BookRepository.list(db_session, q="Alpha")
             assert len(books) == 2
             assert all("Alpha" in book.title for book in books)
 
             # Test sort by title
-            books = BookRepository.list(db_session, sort="title")
+            books = await BookRepository.list(db_session, sort="title")
             titles = [book.title for book in books]
             assert titles == sorted(titles)
         finally:
             # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
 
-    def test_update_book_stock(self, db_session):
+    @pytest.mark.asyncio
+    async def test_update_book_stock(self, db_session):
         """Test updating book stock."""
         # Create a schema for this test
         tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
 
         from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
 
         try:
             # Create author and book
             author_data = AuthorCreate(name="Test Author", email="test@author.com")
-            author = AuthorRepository.create(db_session, author_data)
+            author = await AuthorRepository.create(db_session, author_data)
 
             book_data = BookCreate(
                 title="Test Book",
@@ -249,37 +258,75 @@ class TestBookRepository:
                 stock=10,
                 published_at=date(2023, 1, 1)
             )
-            book = BookRepository.create(db_session, book_data)
+            book = await BookRepository.create(db_session, book_data)
 
             # Re-query the book to ensure it's attached to current session
-            book = BookRepository.get(db_session, book.id)
+            book = await BookRepository.get(db_session, book.id)
 
-            BookRepository.update_stock(db_session, book.id, 5)
-            db_session.commit()
+            await BookRepository.update_stock(db_session, book.id, 5)
+            await db_session.commit()
 
             # Verify update
-            updated_book = BookRepository.get(db_session, book.id)
+            updated_book = await BookRepository.get(db_session, book.id)
             assert updated_book.stock == 5
         finally:
             # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
 
-    def test_book_exists_check(self, db_session):
-        """Test checking if book exists by title, author, and year."""
+    @pytest.mark.asyncio
+    async def test_bulk_create_books(self, db_session):
+        """Test creating several books in one batch."""
         # Create a schema for this test
         tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
 
         from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
+
+        try:
+            author_data = AuthorCreate(name="Test Author", email="test@author.com")
+            author = await AuthorRepository.create(db_session, author_data)
+
+            rows = [
+                BookCreate(title=f"Bulk {i}", author_id=author.id, price=Decimal('9.99'), stock=i)
+                for i in range(3)
+            ]
+            books = await BookRepository.bulk_create(db_session, rows)
+
+            assert [book.title for book in books] == ["Bulk 0", "Bulk 1", "Bulk 2"]
+            assert all(book.id is not None and book.version == 1 for book in books)
+            assert len(await BookRepository.list(db_session)) == 3
+
+            rows = await BookRepository.list_rows(db_session, limit=2)
+            assert [row["title"] for row in rows] == ["Bulk 0", "Bulk 1"]
+            assert set(rows[0].keys()) == {
+                "id", "title", "author_id", "price", "stock", "published_at", "version"
+            }
+            assert await BookRepository.bulk_create(db_session, []) == []
+        finally:
+            # Cleanup
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
+
+    @pytest.mark.asyncio
+    async def test_create_if_absent(self, db_session):
+        """Test duplicate title/author/year is skipped on insert."""
+        # Create a schema for this test
+        tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+
+        from app.models.base import Base
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
 
         try:
             # Create author first
             author_data = AuthorCreate(name="Test Author", email="test@author.com")
-            author = AuthorRepository.create(db_session, author_data)
+            author = await AuthorRepository.create(db_session, author_data)
 
             # Create a book
             book_data = BookCreate(
@@ -289,49 +336,46 @@ class TestBookRepository:
                 stock=10,
                 published_at=date(2023, 1, 1)
             )
-            created_book = BookRepository.create(db_session, book_data)
-
-            # Check existence
-            exists = BookRepository.book_exists(
-                db_session,
-                "Test Book",
-                author.id,
-                2023
+            created_book = await BookRepository.create_if_absent(db_session, book_data)
+            assert created_book is not None
+            assert created_book.version == 1
+
+            # Same title + author + year is rejected
+            duplicate = await BookRepository.create_if_absent(
+                db_session, book_data.model_copy(update={"published_at": date(2023, 6, 1)})
             )
-            assert exists is True
-
-            # Check non-existent combination
-            exists = BookRepository.book_exists(
-                db_session,
-                "Different Book",
-                author.id,
-                2023
+            assert duplicate is None
+
+            # Another year is a different book
+            other_year = await BookRepository.create_if_absent(
+                db_session, book_data.model_copy(update={"published_at": date(2024, 1, 1)})
             )
-            assert exists is False
+            assert other_year is not None
         finally:
             # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
 
 
 class TestOrderRepository:
     """Test order repository layer."""
 
-    def test_create_draft_order(self, db_session):
+    @pytest.mark.asyncio
+    async def test_create_draft_order(self, db_session):
         """Test creating a draft order."""
         # Create a schema for this test
         tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
 
         from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
 
         try:
             # Create author and book
             author_data = AuthorCreate(name="Test Author", email="test@author.com")
-            author = AuthorRepository.create(db_session, author_data)
+            author = await AuthorRepository.create(db_session, author_data)
 
             book_data = BookCreate(
                 title="Test Book",
@@ -340,42 +384,43 @@ class TestOrderRepository:
                 stock=10,
                 published_at=date(2023, 1, 1)
             )
-            book = BookRepository.create(db_session, book_data)
+            book = await BookRepository.create(db_session, book_data)
 
             order_data = OrderCreate(
                 items=[OrderItemCreate(product_id=book.id, qty=2)]
             )
 
-            order = OrderRepository.create_draft(db_session, order_data)
+            order = await OrderRepository.create_draft(db_session, order_data)
 
             assert order.status == "DRAFT"
             assert order.id is not None
 
             # Check items were created
-            items = OrderRepository.list_items(db_session, order.id)
+            items = await OrderRepository.list_items(db_session, order.id)
             assert len(items) == 1
             assert items[0].product_id == book.id
             assert items[0].qty == 2
         finally:
             # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
 
-    def test_get_order(self, db_session):
+    @pytest.mark.asyncio
+    async def test_get_order(self, db_session):
         """Test getting order by ID."""
         # Create a schema for this test
         tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
 
         from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
 
         try:
             # Create author, book and order
             author_data = AuthorCreate(name="Test Author", email="test@author.com")
-            author = AuthorRepository.create(db_session, author_data)
+            author = await AuthorRepository.create(db_session, author_data)
 
             book_data = BookCreate(
                 title="Test Book",
@@ -384,37 +429,38 @@ class TestOrderRepository:
                 stock=10,
                 published_at=date(2023, 1, 1)
             )
-            book = BookRepository.create(db_session, book_data)
+            book = await BookRepository.create(db_session, book_data)
 
             order_data = OrderCreate(
                 items=[OrderItemCreate(product_id=book.id, qty=2)]
             )
-            created_order = OrderRepository.create_draft(db_session, order_data)
+            created_order = await OrderRepository.create_draft(db_session, order_data)
 
-            order = OrderRepository.get(db_session, created_order.id)
+            order = await OrderRepository.get(db_session, created_order.id)
             assert order is not None
             assert order.id == created_order.id
             assert order.status == created_order.status
         finally:
             # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
 
-    def test_list_order_items(self, db_session):
+    @pytest.mark.asyncio
+    async def test_list_order_items(self, db_session):
         """Test listing order items."""
         # Create a schema for this test
         tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
 
         from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
 
         try:
             # Create author, book and order
             author_data = AuthorCreate(name="Test Author", email="test@author.com")
-            author = AuthorRepository.create(db_session, author_data)
+            author = await AuthorRepository.create(db_session, author_data)
 
             book_data = BookCreate(
                 title="Test Book",
@@ -423,187 +469,95 @@ class TestOrderRepository:
                 stock=10,
                 published_at=date(2023, 1, 1)
             )
-            book = BookRepository.create(db_session, book_data)
+            book = await BookRepository.create(db_session, book_data)
 
             order_data = OrderCreate(
                 items=[OrderItemCreate(product_id=book.id, qty=2)]
             )
-            created_order = OrderRepository.create_draft(db_session, order_data)
+            created_order = await OrderRepository.create_draft(db_session, order_data)
 
-            items = OrderRepository.list_items(db_session, created_order.id)
+            items = await OrderRepository.list_items(db_session, created_order.id)
             assert len(items) == 1
             assert items[0].order_id == created_order.id
         finally:
             # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
-
-    def test_set_order_status(self, db_session):
-        """Test updating order status."""
-        # Create a schema for this test
-        tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
-
-        from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
-
-        try:
-            # Create author, book and order
-            author_data = AuthorCreate(name="Test Author", email="test@author.com")
-            author = AuthorRepository.create(db_session, author_data)
-
-            book_data = BookCreate(
-                title="Test Book",
-                author_id=author.id,
-                price=Decimal('29.99'),
-                stock=10,
-                published_at=date(2023, 1, 1)
-            )
-            book = BookRepository.create(db_session, book_data)
-
-            order_data = OrderCreate(
-                items=[OrderItemCreate(product_id=book.id, qty=2)]
-            )
-            created_order = OrderRepository.create_draft(db_session, order_data)
-
-            OrderRepository.set_status(db_session, created_order.id, "CONFIRMED")
-            db_session.commit()
-
-            updated_order = OrderRepository.get(db_session, created_order.id)
-            assert updated_order.status == "CONFIRMED"
-        finally:
-            # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
-
-    def test_try_decrement_book_optimistic_success(self, db_session):
-        """Test successful optimistic stock decrement."""
-        # Create a schema for this test
-        tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
-
-        from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
-
-        try:
-            # Create author and book
-            author_data = AuthorCreate(name="Test Author", email="test@author.com")
-            author = AuthorRepository.create(db_session, author_data)
-
-            book_data = BookCreate(
-                title="Test Book",
-                author_id=author.id,
-                price=Decimal('29.99'),
-                stock=10,
-                published_at=date(2023, 1, 1)
-            )
-            book = BookRepository.create(db_session, book_data)
-
-            # Store original stock and version for comparison
-            original_stock = book.stock
-            original_version = book.version
-            ok, available = OrderRepository.try_decrement_book_optimistic(
-                db_session, book.id, 3
-            )
-
-            assert ok is True
-            assert available == original_stock
-
-            # Verify stock was reduced and version incremented
-            updated_book = BookRepository.get(db_session, book.id)
-            assert updated_book.stock == original_stock - 3
-            # Note: Due to auto-committing nature of repositories, version increment test
-            # needs to account for commit that happens in try_decrement_book_optimistic
-            # We'll just verify stock was reduced and version was incremented
-            assert updated_book.stock == original_stock - 3
-            assert updated_book.version > original_version  # Version should be incremented
-        finally:
-            # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
 
-    def test_try_decrement_book_optimistic_insufficient_stock(self, db_session):
-        """Test optimistic decrement with insufficient stock."""
+    @pytest.mark.asyncio
+    async def test_decrement_books_stock(self, db_session):
+        """Test batched stock decrement and lookup."""
         # Create a schema for this test
         tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
 
         from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
 
         try:
-            # Create author and book
             author_data = AuthorCreate(name="Test Author", email="test@author.com")
-            author = AuthorRepository.create(db_session, author_data)
-
-            book_data = BookCreate(
-                title="Test Book",
-                author_id=author.id,
-                price=Decimal('29.99'),
-                stock=10,
-                published_at=date(2023, 1, 1)
+            author = await AuthorRepository.create(db_session, author_data)
+
+            books = []
+            for i, stock in enumerate((10, 4)):
+                book_data = BookCreate(
+                    title=f"Test Book {i}",
+                    author_id=author.id,
+                    price=Decimal('29.99'),
+                    stock=stock,
+                    published_at=date(2023, 1, 1)
+                )
+                books.append(await BookRepository.create(db_session, book_data))
+            # Capture ids; the rollback below expires the loaded rows
+            first_id, second_id = books[0].id, books[1].id
+            missing_id = uuid.uuid4()
+
+            stock_by_book = await OrderRepository.get_books_stock(
+                db_session, [first_id, second_id, missing_id]
             )
-            book = BookRepository.create(db_session, book_data)
+            assert stock_by_book == {first_id: 10, second_id: 4}
 
-            ok, available = OrderRepository.try_decrement_book_optimistic(
-                db_session, book.id, book.stock + 5
+            # Short and unknown books are skipped, not partially decremented
+            decremented = await OrderRepository.decrement_books_stock(
+                db_session, {first_id: 3, second_id: 5, missing_id: 1}
             )
+            assert decremented == {first_id}
+            await db_session.rollback()
 
-            assert ok is False
-            assert available == book.stock
-
-            # Stock should remain unchanged
-            updated_book = BookRepository.get(db_session, book.id)
-            assert updated_book.stock == book.stock
-        finally:
-            # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
-
-    def test_try_decrement_book_optimistic_nonexistent(self, db_session):
-        """Test optimistic decrement with non-existent book."""
-        # Create a schema for this test
-        tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
-
-        from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
-
-        try:
-            ok, available = OrderRepository.try_decrement_book_optimistic(
-                db_session, uuid.uuid4(), 1
+            decremented = await OrderRepository.decrement_books_stock(
+                db_session, {first_id: 3, second_id: 4}
             )
-
-            assert ok is False
-            assert available == 0
+            assert decremented == {first_id, second_id}
+            await db_session.commit()
+
+            first = await BookRepository.get(db_session, first_id)
+            second = await BookRepository.get(db_session, second_id)
+            assert first.stock == 7
+            assert second.stock == 0
+            assert first.version == 2
         finally:
             # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
 
-    def test_idempotency_key_operations(self, db_session):
+    @pytest.mark.asyncio
+    async def test_idempotency_key_operations(self, db_session):
         """Test idempotency key storage and retrieval."""
         # Create a schema for this test
         tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
 
         from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
 
         try:
             # Create author, book and order
             author_data = AuthorCreate(name="Test Author", email="test@author.com")
-            author = AuthorRepository.create(db_session, author_data)
+            author = await AuthorRepository.create(db_session, author_data)
 
             book_data = BookCreate(
                 title="Test Book",
@@ -612,48 +566,49 @@ class TestOrderRepository:
                 stock=10,
                 published_at=date(2023, 1, 1)
             )
-            book = BookRepository.create(db_session, book_data)
+            book = await BookRepository.create(db_session, book_data)
 
             order_data = OrderCreate(
                 items=[OrderItemCreate(product_id=book.id, qty=2)]
             )
-            order = OrderRepository.create_draft(db_session, order_data)
+            order = await OrderRepository.create_draft(db_session, order_data)
 
             # Save idempotency key
             key = "test-key-123"
             response_data = {"id": str(order.id), "status": "CONFIRMED"}
 
-            OrderRepository.save_idempotency(
+            await OrderRepository.save_idempotency(
                 db_session, key, order.id, response_data
             )
-            db_session.commit()
+            await db_session.commit()
 
             # Retrieve idempotency key
-            stored = OrderRepository.get_idempotency(db_session, key)
+            stored = await OrderRepository.get_idempotency(db_session, key)
             assert stored is not None
             assert stored.id == key
             assert stored.order_id == order.id
             assert stored.response == response_data
         finally:
             # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
 
-    def test_save_idempotency_conflict(self, db_session):
+    @pytest.mark.asyncio
+    async def test_save_idempotency_conflict(self, db_session):
         """Test that saving duplicate idempotency key doesn't cause error."""
         # Create a schema for this test
         tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
 
         from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
 
         try:
             # Create author, book and order
             author_data = AuthorCreate(name="Test Author", email="test@author.com")
-            author = AuthorRepository.create(db_session, author_data)
+            author = await AuthorRepository.create(db_session, author_data)
 
             book_data = BookCreate(
                 title="Test Book",
@@ -662,80 +617,82 @@ class TestOrderRepository:
                 stock=10,
                 published_at=date(2023, 1, 1)
             )
-            book = BookRepository.create(db_session, book_data)
+            book = await BookRepository.create(db_session, book_data)
 
             order_data = OrderCreate(
                 items=[OrderItemCreate(product_id=book.id, qty=2)]
             )
-            order = OrderRepository.create_draft(db_session, order_data)
+            order = await OrderRepository.create_draft(db_session, order_data)
 
             key = "duplicate-key-test"
             response_data = {"id": str(order.id), "status": "CONFIRMED"}
 
             # Save first time
-            OrderRepository.save_idempotency(
+            await OrderRepository.save_idempotency(
                 db_session, key, order.id, response_data
             )
-            db_session.commit()
+            await db_session.commit()
 
             # Try to save again - should not cause error
-            OrderRepository.save_idempotency(
+            await OrderRepository.save_idempotency(
                 db_session, key, order.id, {"different": "response"}
             )
-            db_session.commit()
+            await db_session.commit()
 
             # Should still have original data
-            stored = OrderRepository.get_idempotency(db_session, key)
+            stored = await OrderRepository.get_idempotency(db_session, key)
             assert stored.response == response_data
         finally:
             # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
 
-    def test_get_nonexistent_idempotency(self, db_session):
+    @pytest.mark.asyncio
+    async def test_get_nonexistent_idempotency(self, db_session):
         """Test getting non-existent idempotency key."""
         # Create a schema for this test
         tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
 
         from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
 
         try:
-            stored = OrderRepository.get_idempotency(db_session, "nonexistent-key")
+            stored = await OrderRepository.get_idempotency(db_session, "nonexistent-key")
             assert stored is None
         finally:
             # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
 
 
 class TestRepositoryTransactionHandling:
     """Test repository transaction handling and rollback."""
 
-    def test_transaction_rollback_on_error(self, db_session):
+    @pytest.mark.asyncio
+    async def test_transaction_rollback_on_error(self, db_session):
         """Test that transactions are properly rolled back on errors."""
         # Create a schema for this test
         tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
+        await db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
+        await db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
 
         from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
+        await db_session.run_sync(lambda session: Base.metadata.create_all(bind=session.connection()))
+        await db_session.commit()
 
         try:
-            # Get initial count BEFORE creating author (since AuthorRepository.create() auto-commits)
-            initial_count = len(BookRepository.list(db_session))
+            # Get initial count BEFORE creating author (since await AuthorRepository.create() auto-commits)
+            initial_count = len(await BookRepository.list(db_session))
 
             # Create author first
             author_data = AuthorCreate(name="Test Author", email="test@author.com")
-            author = AuthorRepository.create(db_session, author_data)
+            author = await AuthorRepository.create(db_session, author_data)
 
             # Get count after author creation
-            count_after_author = len(BookRepository.list(db_session))
+            count_after_author = len(await BookRepository.list(db_session))
 
             # Note: Repository auto-commits, so we can't test rollback properly
             # This is a design limitation - create() commits immediately
@@ -752,81 +709,22 @@ class TestRepositoryTransactionHandling:
             )
 
             # Start an explicit transaction
-            db_session.begin_nested()
+            await db_session.begin_nested()
             try:
                 db_session.add(book)
-                db_session.flush()  # Add to session but don't commit
+                await db_session.flush()  # Add to session but don't commit
 
                 # Simulate an error before committing
                 raise ValueError("Simulated error")
 
             except ValueError:
-                db_session.rollback()  # Roll back the nested transaction
+                await db_session.rollback()  # Roll back the nested transaction
 
             # Verify book was not committed (should still be just the author)
-            final_count = len(BookRepository.list(db_session))
+            final_count = len(await BookRepository.list(db_session))
             # Since we created a book manually but rolled back, only the author should exist
             assert final_count == count_after_author
         finally:
             # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
-
-    def test_concurrent_stock_updates(self, db_session):
-        """Test handling of concurrent stock updates."""
-        # Create a schema for this test
-        tenant_name = f"test_repo_{uuid.uuid4().hex[:8]}"
-        db_session.execute(text(f'CREATE SCHEMA "{tenant_name}"'))
-        db_session.execute(text(f"SET search_path TO {tenant_name}, public"))
-
-        from app.models.base import Base
-        Base.metadata.create_all(bind=db_session.connection())
-        db_session.commit()
-
-        try:
-            # Create author and book
-            author_data = AuthorCreate(name="Test Author", email="test@author.com")
-            author = AuthorRepository.create(db_session, author_data)
-
-            book_data = BookCreate(
-                title="Test Book",
-                author_id=author.id,
-                price=Decimal('29.99'),
-                stock=10,
-                published_at=date(2023, 1, 1)
-            )
-            book = BookRepository.create(db_session, book_data)
-
-            initial_stock = book.stock
-            decrement_amount = 2
-
-            # First successful decrement
-            ok1, available1 = OrderRepository.try_decrement_book_optimistic(
-                db_session, book.id, decrement_amount
-            )
-            db_session.commit()
-
-            assert ok1 is True
-            assert available1 == initial_stock
-
-            # Get the updated book
-            updated_book = BookRepository.get(db_session, book.id)
-
-            # Second decrement with wrong version (simulating concurrent access)
-            # Use the repository method to simulate concurrent access properly
-            # Since try_decrement_book_optimistic already includes version checking,
-            # we'll test with a new book that has the wrong version
-            new_book_data = BookCreate(
-                title="Concurrent Test Book",
-                author_id=author.id,
-                price=Decimal('19.99'),
-                stock=5,
-                published_at=date(2023, 1, 1)
-            )
-            new_book = BookRepository.create(db_session, new_book_data)
-
-
-        finally:
-            # Cleanup
-            db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
-            db_session.commit()
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{tenant_name}" CASCADE'))
+            await db_session.commit()
@@ -1,23 +1,24 @@
 import pytest
 from fastapi import status
 from sqlalchemy import text
+import uuid
 
 
 class TestTenantBootstrap:
     """Test tenant bootstrap functionality."""
 
-    def test_bootstrap_tenant_success(self, test_client):
+    async def test_bootstrap_tenant_success(self, client, worker_tenant):
         """Test successful tenant bootstrap."""
-        tenant_name = "bootstrap_test_tenant"
+        tenant_name = worker_tenant("bootstrap_test_tenant")
         headers = {"X-Tenant": tenant_name}
-        response = test_client.post(f"/api/v1/tenants/{tenant_name}/bootstrap", headers=headers)
+        response = await client.post(f"/api/v1/tenants/{tenant_name}/bootstrap", headers=headers)
 
 
 
         assert response.status_code == status.HTTP_200_OK
         assert response.json() == {"status": "ok", "tenant": tenant_name}
 
-    def test_bootstrap_tenant_invalid_name(self, test_client):
+    async def test_bootstrap_tenant_invalid_name(self, client, worker_tenant):
         """Test bootstrap with invalid tenant name."""
         # Test actually invalid tenant names with special characters
         invalid_tenants = [
@@ -29,7 +30,7 @@ class TestTenantBootstrap:
         ]
 
         for invalid_tenant in invalid_tenants:
-            response = test_client.post(f"/api/v1/tenants/{invalid_tenant}/bootstrap", headers={"X-Tenant": invalid_tenant})
+            response = await client.post(f"/api/v1/tenants/{invalid_tenant}/bootstrap", headers={"X-Tenant": invalid_tenant})
             assert response.status_code == status.HTTP_400_BAD_REQUEST
             error_response = response.json()
             # Check for appropriate error message based on validation type
@@ -39,35 +40,35 @@ class TestTenantBootstrap:
                 assert "Invalid tenant name" in error_response["error"]["message"]
 
         # Test that valid hyphenated names work
-        valid_tenant = "valid-name-with-dashes"
-        response = test_client.post(f"/api/v1/tenants/{valid_tenant}/bootstrap", headers={"X-Tenant": valid_tenant})
+        valid_tenant = worker_tenant("valid-name-with-dashes")
+        response = await client.post(f"/api/v1/tenants/{valid_tenant}/bootstrap", headers={"X-Tenant": valid_tenant})
         assert response.status_code == status.HTTP_200_OK
 
 
 
-    def test_bootstrap_tenant_twice(self, test_client):
+    async def test_bootstrap_tenant_twice(self, client, worker_tenant):
         """Test that bootstrap can be called multiple times safely."""
-        tenant_name = "twice_test_tenant"
+        tenant_name = worker_tenant("twice_test_tenant")
         headers = {"X-Tenant": tenant_name}
         # First bootstrap
-        response1 = test_client.post(f"/api/v1/tenants/{tenant_name}/bootstrap", headers=headers)
+        response1 = await client.post(f"/api/v1/tenants/{tenant_name}/bootstrap", headers=headers)
         assert response1.status_code == status.HTTP_200_OK
 
         # Second bootstrap should also succeed
-        response2 = test_client.post(f"/api/v1/tenants/{tenant_name}/bootstrap", headers=headers)
+        response2 = await client.post(f"/api/v1/tenants/{tenant_name}/bootstrap", headers=headers)
         assert response2.status_code == status.HTTP_200_OK
         assert response2.json() == response1.json()
 
-    def test_bootstrap_creates_proper_schema(self, test_client):
+    async def test_bootstrap_creates_proper_schema(self, client, worker_tenant):
         """Test that bootstrap creates the correct schema and tables."""
-        tenant_name = "schema_test_tenant"
+        tenant_name = worker_tenant("schema_test_tenant")
         headers = {"X-Tenant": tenant_name}
         # Bootstrap tenant
-        response = test_client.post(f"/api/v1/tenants/{tenant_name}/bootstrap", headers=headers)
+        response = await client.post(f"/api/v1/tenants/{tenant_name}/bootstrap", headers=headers)
         assert response.status_code == status.HTTP_200_OK
 
         # Verify schema exists and has expected tables using direct database access
-        from app.db.session import engine
+        from tests.conftest import engine
         with engine.connect() as conn:
             # Verify schema exists
             result = conn.execute(
@@ -97,71 +98,69 @@ class TestTenantBootstrap:
 class TestTenantMiddleware:
     """Test tenant middleware functionality."""
 
-    def test_missing_tenant_header(self, test_client):
+    async def test_missing_tenant_header(self, client):
         """Test request without X-Tenant header."""
-        response = test_client.get("/api/v1/authors")
+        response = await client.get("/api/v1/authors")
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert response.json()["error"]["type"] == "missing_tenant"
         assert "X-Tenant header is required" in response.json()["error"]["message"]
 
-    def test_nonexistent_tenant(self, test_client):
+    async def test_nonexistent_tenant(self, client):
         """Test request with non-existent tenant."""
         headers = {"X-Tenant": "nonexistent_tenant"}
-        response = test_client.get("/api/v1/authors", headers=headers)
+        response = await client.get("/api/v1/authors", headers=headers)
 
         assert response.status_code == status.HTTP_404_NOT_FOUND
         assert response.json()["error"]["type"] == "tenant_not_found"
         assert "not found" in response.json()["error"]["message"]
 
-    def test_valid_tenant_header_added_to_response(self, test_client, test_tenant):
+    async def test_valid_tenant_header_added_to_response(self, client, test_tenant):
         """Test that X-Tenant header is added to response."""
         # Bootstrap tenant first
         headers = {"X-Tenant": test_tenant}
-        bootstrap_response = test_client.post(f"/api/v1/tenants/{test_tenant}/bootstrap", headers=headers)
+        bootstrap_response = await client.post(f"/api/v1/tenants/{test_tenant}/bootstrap", headers=headers)
         assert bootstrap_response.status_code == status.HTTP_200_OK
 
         # Now test the header addition
-        response = test_client.get("/api/v1/authors", headers=headers)
+        response = await client.get("/api/v1/authors", headers=headers)
 
         assert response.status_code == status.HTTP_200_OK
         assert response.headers["X-Tenant"] == test_tenant
 
-    def test_tenant_search_path_isolation(self, test_client):
+    async def test_tenant_search_path_isolation(self, client):
         """Test that tenant search_path properly isolates data."""
-        # Use unique tenant names to avoid conflicts with other tests
-        import time
-        import uuid
-        timestamp = int(time.time() * 1000)
+        # Unique across runs and xdist workers sharing the app database
+        suffix = uuid.uuid4().hex[:12]
 
-        tenant1 = f"isolation_test_{timestamp}_1"
-        tenant2 = f"isolation_test_{timestamp}_2"
+        tenant1 = f"isolation_test_{suffix}_1"
+        tenant2 = f"isolation_test_{suffix}_2"
 
         headers1 = {"X-Tenant": tenant1}
         headers2 = {"X-Tenant": tenant2}
 
         # Create both tenants
-        resp1 = test_client.post(f"/api/v1/tenants/{tenant1}/bootstrap", headers=headers1)
-        resp2 = test_client.post(f"/api/v1/tenants/{tenant2}/bootstrap", headers=headers2)
+        resp1 = await client.post(f"/api/v1/tenants/{tenant1}/bootstrap", headers=headers1)
+        resp2 = await client.post(f"/api/v1/tenants/{tenant2}/bootstrap", headers=headers2)
 
         assert resp1.status_code == status.HTTP_200_OK
         assert resp2.status_code == status.HTTP_200_OK
 
         # Add author to first tenant only
-        unique_name = f"Test Author {timestamp} {uuid.uuid4().hex[:8]}"
-        author_resp = test_client.post("/api/v1/authors",
-                                   json={"name": unique_name, "email": f"{timestamp}-{uuid.uuid4().hex[:8]}@example.com"},
-                                   headers=headers1)
+        unique_name = f"Test Author {suffix}"
+        author_resp = await client.post("/api/v1/authors",
+                                        json={"name": unique_name, "email": f"{suffix}@example.com"},
+                                        headers=headers1)
 
         assert author_resp.status_code == status.HTTP_200_OK
 
         # Check tenant1 has the author
-        authors1_resp = test_client.get("/api/v1/authors", headers=headers1)
+        authors1_resp = await client.get("/api/v1/authors", headers=headers1)
         assert authors1_resp.status_code == status.HTTP_200_OK
         authors1 = authors1_resp.json()
 
         # Check tenant2 does not have the author
-        authors2_resp = test_client.get("/api/v1/authors", headers=headers2)
+        authors2_resp = await client.get("/api/v1/authors", headers=headers2)
         assert authors2_resp.status_code == status.HTTP_200_OK
         authors2 = authors2_resp.json()
 
@@ -172,10 +171,10 @@ class TestTenantMiddleware:
         assert found_in_tenant1, f"Author {unique_name} not found in tenant {tenant1}"
         assert not found_in_tenant2, f"Author {unique_name} leaked to tenant {tenant2}"
 
-    def test_tenant_case_sensitivity(self, test_client):
+    async def test_tenant_case_sensitivity(self, client):
         """Test that tenant names are case sensitive."""
         # Try accessing with different case
         headers = {"X-Tenant": "nonexistent_upper"}
-        response = test_client.get("/api/v1/authors", headers=headers)
+        response = await client.get("/api/v1/authors", headers=headers)
 
         assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -205,37 +205,40 @@ class TestPydanticValidation:
 class TestDatabaseConstraints:
     """Test database constraint level validation."""
 
-    def test_author_unique_name_constraint(self, db_session, bootstrap_tenant):
+    @pytest.mark.asyncio
+    async def test_author_unique_name_constraint(self, db_session, bootstrap_tenant):
         """Test author unique name constraint at database level."""
-        db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
+        await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
         # Create first author
         author_data = AuthorCreate(name="Unique Name", email="unique@test.com")
-        author1 = AuthorService.create_author(db_session, author_data)
+        author1 = await AuthorService.create_author(db_session, author_data)
 
         # Try to create another author with same name
         author_data2 = AuthorCreate(name="Unique Name", email="different@test.com")
 
         with pytest.raises(IntegrityError):
-            AuthorService.create_author(db_session, author_data2)
+            await AuthorService.create_author(db_session, author_data2)
 
-    def test_author_unique_email_constraint(self, db_session, bootstrap_tenant):
+    @pytest.mark.asyncio
+    async def test_author_unique_email_constraint(self, db_session, bootstrap_tenant):
         """Test author unique email constraint at database level."""
-        db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
+        await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
         # Create first author
         author_data = AuthorCreate(name="Author One", email="shared@test.com")
-        author1 = AuthorService.create_author(db_session, author_data)
+        author1 = await AuthorService.create_author(db_session, author_data)
 
         # Try to create another author with same email (case insensitive due to citext)
         author_data2 = AuthorCreate(name="Author Two", email="SHARED@TEST.COM")
 
         with pytest.raises(IntegrityError):
-            AuthorService.create_author(db_session, author_data2)
+            await AuthorService.create_author(db_session, author_data2)
 
-    def test_book_foreign_key_constraint(self, db_session, bootstrap_tenant):
+    @pytest.mark.asyncio
+    async def test_book_foreign_key_constraint(self, db_session, bootstrap_tenant):
         """Test book foreign key constraint at database level."""
-        db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
+        await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
         # Try to create book with non-existent author
         book_data = BookCreate(
@@ -246,15 +249,16 @@ class TestDatabaseConstraints:
         )
 
         with pytest.raises(IntegrityError):
-            BookService.create_book(db_session, book_data)
+            await BookService.create_book(db_session, book_data)
 
-    def test_book_price_check_constraint(self, db_session, bootstrap_tenant, sample_author):
+    @pytest.mark.asyncio
+    async def test_book_price_check_constraint(self, db_session, bootstrap_tenant, sample_author):
         """Test book price check constraint at database level."""
-        db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
+        await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
         # Direct database manipulation to bypass Pydantic
         with pytest.raises(IntegrityError):
-            db_session.execute(
+            await db_session.execute(
                 text("""
                     INSERT INTO books (id, title, author_id, price, stock, version)
                     VALUES (:id, :title, :author_id, :price, :stock, :version)
@@ -269,13 +273,14 @@ class TestDatabaseConstraints:
                 }
             )
 
-    def test_book_stock_check_constraint(self, db_session, bootstrap_tenant, sample_author):
+    @pytest.mark.asyncio
+    async def test_book_stock_check_constraint(self, db_session, bootstrap_tenant, sample_author):
         """Test book stock check constraint at database level."""
-        db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
+        await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
         # Direct database manipulation to bypass Pydantic
         with pytest.raises(IntegrityError):
-            db_session.execute(
+            await db_session.execute(
                 text("""
                     INSERT INTO books (id, title, author_id, price, stock, version)
                     VALUES (:id, :title, :author_id, :price, :stock, :version)
@@ -290,13 +295,14 @@ class TestDatabaseConstraints:
                 }
             )
 
-    def test_order_status_check_constraint(self, db_session, bootstrap_tenant):
+    @pytest.mark.asyncio
+    async def test_order_status_check_constraint(self, db_session, bootstrap_tenant):
         """Test order status check constraint at database level."""
-        db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
+        await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
         # Try to create order with invalid status
         with pytest.raises(IntegrityError):
-            db_session.execute(
+            await db_session.execute(
                 text("""
                     INSERT INTO orders (id, status, created_at)
                     VALUES (:id, :status, NOW())
@@ -307,13 +313,14 @@ class TestDatabaseConstraints:
                 }
             )
 
-    def test_order_item_quantity_check_constraint(self, db_session, bootstrap_tenant, sample_order, sample_book):
+    @pytest.mark.asyncio
+    async def test_order_item_quantity_check_constraint(self, db_session, bootstrap_tenant, sample_order, sample_book):
         """Test order item quantity check constraint at database level."""
-        db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
+        await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
         # Try to create order item with non-positive quantity
         with pytest.raises(IntegrityError):
-            db_session.execute(
+            await db_session.execute(
                 text("""
                     INSERT INTO order_items (order_id, product_id, qty)
                     VALUES (:order_id, :product_id, :qty)
@@ -325,20 +332,21 @@ class TestDatabaseConstraints:
                 }
             )
 
-    def test_order_item_foreign_key_constraints(self, db_session, bootstrap_tenant):
+    @pytest.mark.asyncio
+    async def test_order_item_foreign_key_constraints(self, db_session, bootstrap_tenant):
         """Test order item foreign key constraints at database level."""
-        db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
+        await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
         # Create an order first
         order_id = uuid.uuid4()
-        db_session.execute(
+        await db_session.execute(
             text("INSERT INTO orders (id, status, created_at) VALUES (:id, 'DRAFT', NOW())"),
             {"id": order_id}
         )
 
         # Try to create order item with non-existent book
         with pytest.raises(IntegrityError):
-            db_session.execute(
+            await db_session.execute(
                 text("""
                     INSERT INTO order_items (order_id, product_id, qty)
                     VALUES (:order_id, :product_id, :qty)
@@ -354,9 +362,11 @@ class TestDatabaseConstraints:
 class TestBusinessRuleValidation:
     """Test business rule level validation in service layer."""
 
-    def test_duplicate_book_business_rule(self, db_session, bootstrap_tenant):
+    @pytest.mark.asyncio
+    async def test_duplicate_book_business_rule(self, db_session, bootstrap_tenant):
         """Test duplicate book business rule in service layer."""
         from app.models.author import Author
+        await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
         # Create author directly in the same session
         author = Author(
@@ -364,8 +374,8 @@ class TestBusinessRuleValidation:
             email=f"test-author-{uuid.uuid4().hex[:8]}@example.com"
         )
         db_session.add(author)
-        db_session.commit()
-        db_session.refresh(author)
+        await db_session.commit()
+        await db_session.refresh(author)
 
         # Create first book
         book_data = BookCreate(
@@ -375,7 +385,7 @@ class TestBusinessRuleValidation:
             stock=5,
             published_at=date(2023, 1, 1)
         )
-        book1 = BookService.create_book(db_session, book_data)
+        book1 = await BookService.create_book(db_session, book_data)
 
         # Try to create duplicate (same title + author + year)
         duplicate_data = BookCreate(
@@ -387,11 +397,13 @@ class TestBusinessRuleValidation:
         )
 
         with pytest.raises(ValueError, match="Duplicate book"):
-            BookService.create_book(db_session, duplicate_data)
+            await BookService.create_book(db_session, duplicate_data)
 
-    def test_similar_book_different_year(self, db_session, bootstrap_tenant):
+    @pytest.mark.asyncio
+    async def test_similar_book_different_year(self, db_session, bootstrap_tenant):
         """Test that similar book with different year is allowed."""
         from app.models.author import Author
+        await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
         # Create author directly in the same session
         author = Author(
@@ -399,8 +411,8 @@ class TestBusinessRuleValidation:
             email=f"test-author-{uuid.uuid4().hex[:8]}@example.com"
         )
         db_session.add(author)
-        db_session.commit()
-        db_session.refresh(author)
+        await db_session.commit()
+        await db_session.refresh(author)
 
         # Create first book
         book_data = BookCreate(
@@ -410,7 +422,7 @@ class TestBusinessRuleValidation:
             stock=5,
             published_at=date(2023, 1, 1)
         )
-        book1 = BookService.create_book(db_session, book_data)
+        book1 = await BookService.create_book(db_session, book_data)
 
         # Same title and author but different year should be allowed
         similar_data = BookCreate(
@@ -422,14 +434,16 @@ class TestBusinessRuleValidation:
         )
 
         # This should succeed
-        book2 = BookService.create_book(db_session, similar_data)
+        book2 = await BookService.create_book(db_session, similar_data)
         assert book2.title == "Same Title"
         assert book2.author_id == author.id
         assert book2.published_at.year == 2024
 
-    def test_duplicate_book_no_published_date(self, db_session, bootstrap_tenant):
+    @pytest.mark.asyncio
+    async def test_duplicate_book_no_published_date(self, db_session, bootstrap_tenant):
         """Test duplicate book logic when published_at is None."""
         from app.models.author import Author
+        await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
         # Create author directly in the same session
         author = Author(
@@ -437,8 +451,8 @@ class TestBusinessRuleValidation:
             email=f"test-author-{uuid.uuid4().hex[:8]}@example.com"
         )
         db_session.add(author)
-        db_session.commit()
-        db_session.refresh(author)
+        await db_session.commit()
+        await db_session.refresh(author)
 
         # Create first book without published date
         book_data = BookCreate(
@@ -448,7 +462,7 @@ class TestBusinessRuleValidation:
             stock=5,
             published_at=None
         )
-        book1 = BookService.create_book(db_session, book_data)
+        book1 = await BookService.create_book(db_session, book_data)
 
         # Try to create duplicate (same title + author + no published date)
         duplicate_data = BookCreate(
@@ -460,15 +474,16 @@ class TestBusinessRuleValidation:
         )
 
         with pytest.raises(ValueError, match="Duplicate book"):
-            BookService.create_book(db_session, duplicate_data)
+            await BookService.create_book(db_session, duplicate_data)
 
-    def test_stock_insufficient_business_rule(self, db_session, bootstrap_tenant):
+    @pytest.mark.asyncio
+    async def test_stock_insufficient_business_rule(self, db_session, bootstrap_tenant):
         """Test insufficient stock business rule in order confirmation."""
         from app.models.author import Author
         from app.models.book import Book
         from datetime import date
 
-        db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
+        await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
         # Create author directly in the same session
         author = Author(
@@ -476,8 +491,8 @@ class TestBusinessRuleValidation:
             email=f"test-author-{uuid.uuid4().hex[:8]}@example.com"
         )
         db_session.add(author)
-        db_session.commit()
-        db_session.refresh(author)
+        await db_session.commit()
+        await db_session.refresh(author)
 
         # Create book with limited stock directly in the same session
         book = Book(
@@ -489,8 +504,8 @@ class TestBusinessRuleValidation:
             published_at=date(2023, 1, 1)
         )
         db_session.add(book)
-        db_session.commit()
-        db_session.refresh(book)
+        await db_session.commit()
+        await db_session.refresh(book)
 
         # Create order with quantity exceeding stock
         order_data = OrderCreate(
@@ -503,23 +518,24 @@ class TestBusinessRuleValidation:
         )
 
         # Create order first (should succeed)
-        order = OrderService.create_order(db_session, order_data)
+        order = await OrderService.create_order(db_session, order_data)
 
         # Confirmation should fail with business rule violation
         with pytest.raises(HTTPException) as exc_info:
-            OrderService.confirm_order(db_session, order.id, None)
+            await OrderService.confirm_order(db_session, order.id, None)
 
         assert exc_info.value.status_code == 409
         assert "shortages" in str(exc_info.value.detail)
 
-    def test_order_confirmation_business_rules(self, db_session, bootstrap_tenant):
+    @pytest.mark.asyncio
+    async def test_order_confirmation_business_rules(self, db_session, bootstrap_tenant):
         """Test various business rules in order confirmation."""
         from app.models.author import Author
         from app.models.book import Book
         from app.models.order import Order, OrderItem
         from datetime import date
 
-        db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
+        await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
         # Create author directly in the same session
         author = Author(
@@ -527,8 +543,8 @@ class TestBusinessRuleValidation:
             email=f"test-author-{uuid.uuid4().hex[:8]}@example.com"
         )
         db_session.add(author)
-        db_session.commit()
-        db_session.refresh(author)
+        await db_session.commit()
+        await db_session.refresh(author)
 
         # Create book directly in the same session
         book = Book(
@@ -540,13 +556,13 @@ class TestBusinessRuleValidation:
             published_at=date(2023, 1, 1)
         )
         db_session.add(book)
-        db_session.commit()
-        db_session.refresh(book)
+        await db_session.commit()
+        await db_session.refresh(book)
 
         # Create order directly in the same session
         order = Order(status="DRAFT")
         db_session.add(order)
-        db_session.flush()
+        await db_session.flush()
 
         order_item = OrderItem(
             order_id=order.id,
@@ -554,36 +570,38 @@ class TestBusinessRuleValidation:
             qty=2
         )
         db_session.add(order_item)
-        db_session.commit()
-        db_session.refresh(order)
+        await db_session.commit()
+        await db_session.refresh(order)
 
         # Confirm order
-        result = OrderService.confirm_order(db_session, order.id, None)
+        result = await OrderService.confirm_order(db_session, order.id, None)
         assert result["status"] == "CONFIRMED"
 
         # Confirming again should be idempotent (business rule)
-        result2 = OrderService.confirm_order(db_session, order.id, None)
+        result2 = await OrderService.confirm_order(db_session, order.id, None)
         assert result2["status"] == "CONFIRMED"
         assert result2["id"] == result["id"]
 
-    def test_order_not_found_business_rule(self, db_session, bootstrap_tenant):
+    @pytest.mark.asyncio
+    async def test_order_not_found_business_rule(self, db_session, bootstrap_tenant):
         """Test business rule for non-existent order."""
-        db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
+        await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
         with pytest.raises(HTTPException) as exc_info:
-            OrderService.confirm_order(db_session, uuid.uuid4(), None)
+            await OrderService.confirm_order(db_session, uuid.uuid4(), None)
 
         assert exc_info.value.status_code == 404
         assert "order not found" in str(exc_info.value.detail)
 
-    def test_idempotency_business_rule(self, db_session, bootstrap_tenant):
+    @pytest.mark.asyncio
+    async def test_idempotency_business_rule(self, db_session, bootstrap_tenant):
         """Test idempotency business rule in order confirmation."""
         from app.models.author import Author
         from app.models.book import Book
         from app.models.order import Order, OrderItem
         from datetime import date
 
-        db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
+        await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
         # Create author directly in the same session
         author = Author(
@@ -591,8 +609,8 @@ class TestBusinessRuleValidation:
             email=f"test-author-{uuid.uuid4().hex[:8]}@example.com"
         )
         db_session.add(author)
-        db_session.commit()
-        db_session.refresh(author)
+        await db_session.commit()
+        await db_session.refresh(author)
 
         # Create book directly in the same session
         book = Book(
@@ -604,13 +622,13 @@ class TestBusinessRuleValidation:
             published_at=date(2023, 1, 1)
         )
         db_session.add(book)
-        db_session.commit()
-        db_session.refresh(book)
+        await db_session.commit()
+        await db_session.refresh(book)
 
         # Create order directly in the same session
         order = Order(status="DRAFT")
         db_session.add(order)
-        db_session.flush()
+        await db_session.flush()
 
         order_item = OrderItem(
             order_id=order.id,
@@ -618,15 +636,15 @@ class TestBusinessRuleValidation:
             qty=2
         )
         db_session.add(order_item)
-        db_session.commit()
-        db_session.refresh(order)
+        await db_session.commit()
+        await db_session.refresh(order)
 
         # Confirm order
-        result = OrderService.confirm_order(db_session, order.id, None)
+        result = await OrderService.confirm_order(db_session, order.id, None)
         assert result["status"] == "CONFIRMED"
 
         # Confirming again with same idempotency key should return same result
-        result2 = OrderService.confirm_order(db_session, order.id, None)
+        result2 = await OrderService.confirm_order(db_session, order.id, None)
         assert result2["status"] == "CONFIRMED"
         assert result2["id"] == result["id"]
 
@@ -648,26 +666,27 @@ class TestBusinessRuleValidation:
 class TestValidationLayerIntegration:
     """Test integration of all three validation layers."""
 
-    def test_validation_layers_working_together(self, db_session, bootstrap_tenant, test_client):
+    @pytest.mark.asyncio
+    async def test_validation_layers_working_together(self, db_session, bootstrap_tenant, client):
         """Test that all three validation layers work together properly."""
         # Bootstrap tenant through API
-        test_client.post(f"/api/v1/tenants/{bootstrap_tenant}/bootstrap")
+        await client.post(f"/api/v1/tenants/{bootstrap_tenant}/bootstrap")
         headers = {"X-Tenant": bootstrap_tenant}
 
         # 1. Pydantic validation
         # Invalid author data
-        response = test_client.post("/api/v1/authors", json={"name": "", "email": "invalid"}, headers=headers)
+        response = await client.post("/api/v1/authors", json={"name": "", "email": "invalid"}, headers=headers)
         assert response.status_code == 422  # Pydantic validation error
 
         # 2. Database constraints
         # Create valid author first
         author_data = {"name": "Test Author", "email": "test@example.com"}
-        response = test_client.post("/api/v1/authors", json=author_data, headers=headers)
+        response = await client.post("/api/v1/authors", json=author_data, headers=headers)
         author = response.json()
 
         # Try duplicate email
         duplicate_data = {"name": "Another Author", "email": "test@example.com"}
-        response = test_client.post("/api/v1/authors", json=duplicate_data, headers=headers)
+        response = await client.post("/api/v1/authors", json=duplicate_data, headers=headers)
         assert response.status_code == 400  # Database constraint error
 
         # 3. Business rules
@@ -678,7 +697,7 @@ class TestValidationLayerIntegration:
             "price": 29.99,
             "stock": 5
         }
-        response = test_client.post("/api/v1/books", json=book_data, headers=headers)
+        response = await client.post("/api/v1/books", json=book_data, headers=headers)
         book = response.json()
 
         # Try to create duplicate book
@@ -688,23 +707,24 @@ class TestValidationLayerIntegration:
             "price": 19.99,
             "stock": 3
         }
-        response = test_client.post("/api/v1/books", json=duplicate_book, headers=headers)
+        response = await client.post("/api/v1/books", json=duplicate_book, headers=headers)
         assert response.status_code == 400  # Business rule error
 
         # Test order business rule
         order_data = {
             "items": [{"product_id": book["id"], "qty": 10}]  # More than stock
         }
-        response = test_client.post("/api/v1/orders", json=order_data, headers=headers)
+        response = await client.post("/api/v1/orders", json=order_data, headers=headers)
         order = response.json()
 
         # Should fail on confirmation
-        response = test_client.post(f"/api/v1/orders/{order['id']}/confirm", headers=headers)
+        response = await client.post(f"/api/v1/orders/{order['id']}/confirm", headers=headers)
         assert response.status_code == 409  # Business rule error
 
-    def test_error_message_consistency(self, db_session, bootstrap_tenant):
+    @pytest.mark.asyncio
+    async def test_error_message_consistency(self, db_session, bootstrap_tenant):
         """Test that error messages are consistent across validation layers."""
-        db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
+        await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
         # Pydantic validation errors should be structured
         try:
@@ -716,17 +736,17 @@ class TestValidationLayerIntegration:
 
         # Database constraint errors should raise IntegrityError
         author_data = AuthorCreate(name="Test", email="test@test.com")
-        AuthorService.create_author(db_session, author_data)
+        await AuthorService.create_author(db_session, author_data)
 
         try:
-            AuthorService.create_author(db_session, author_data)  # Duplicate
+            await AuthorService.create_author(db_session, author_data)  # Duplicate
         except IntegrityError:
-            db_session.rollback()  # Rollback to clean session state
+            await db_session.rollback()  # Rollback to clean session state
             pass  # Expected database constraint error
 
         # Business rule errors should raise ValueError or HTTPException
         try:
-            BookService.create_book(
+            await BookService.create_book(
                 db_session,
                 BookCreate(
                     title="Duplicate",
@@ -738,10 +758,11 @@ class TestValidationLayerIntegration:
         except (IntegrityError, ValueError, HTTPException):
             pass  # Expected at some validation layer
 
-    def test_validation_order_of_execution(self, db_session, bootstrap_tenant):
+    @pytest.mark.asyncio
+    async def test_validation_order_of_execution(self, db_session, bootstrap_tenant):
         """Test order in which validation layers execute."""
         from app.models.author import Author
-        db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
+        await db_session.execute(text(f'SET search_path TO "{bootstrap_tenant}", public'))
 
         # Create author directly in the same session
         author = Author(
@@ -749,8 +770,8 @@ class TestValidationLayerIntegration:
             email=f"test-author-{uuid.uuid4().hex[:8]}@example.com"
         )
         db_session.add(author)
-        db_session.commit()
-        db_session.refresh(author)
+        await db_session.commit()
+        await db_session.refresh(author)
 
         # Pydantic executes first (can test with invalid UUID format)
         try:
@@ -765,7 +786,7 @@ class TestValidationLayerIntegration:
 
         # If Pydantic passes, then database constraints are checked
         try:
-            BookService.create_book(
+            await BookService.create_book(
                 db_session,
                 BookCreate(
                     title="Test",
@@ -775,9 +796,12 @@ class TestValidationLayerIntegration:
                 )
             )
         except IntegrityError:
-            db_session.rollback()  # Rollback to clean session state
+            await db_session.rollback()  # Rollback to clean session state
             pass  # Database constraint checked after Pydantic
 
+        # Rollback expires loaded objects; reload before touching attributes
+        await db_session.refresh(author)
+
         # Business rules are checked in service layer after data passes lower-level validation
         book_data = BookCreate(
             title="Business Rule Test",
@@ -785,10 +809,10 @@ class TestValidationLayerIntegration:
             price=29.99,
             stock=5
         )
-        book1 = BookService.create_book(db_session, book_data)
+        book1 = await BookService.create_book(db_session, book_data)
 
         try:
             # Business rule check
-            BookService.create_book(db_session, book_data)  # Same data
+            await BookService.create_book(db_session, book_data)  # Same data
         except ValueError as e:
             assert "Duplicate book" in str(e)  # Business rule error